@@ -0,0 +1,209 @@
+# Local stand-ins for the services the backend talks to, all served from one uvicorn
+# instance on a background thread:
+#
+#   GET  /api/1/latest          newsdata.io style feed, links point at /site/...
+#   GET  /site/{slug}.html      article pages newspaper3k can parse
+#   POST /v1/chat/completions   OpenAI chat completions, plain and streamed, optionally rate limited
+#
+# Everything is generated from a seed, so two runs see identical feeds and articles.
+import asyncio
+import json
+import random
+import socket
+import threading
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+WORDS = (
+    "government market energy climate election court company research city council budget "
+    "inflation vaccine players season league earnings investors policy report study officials "
+    "union workers housing prices rates growth security trade border technology software "
+    "startup launch network storage satellite museum festival album film director hospital"
+).split()
+
+SUMMARY = {
+    "summary": [
+        "Officials outlined the main points of the plan.",
+        "Critics raised concerns about costs and timing.",
+        "Supporters argued the change was overdue.",
+        "A vote is expected later this month.",
+        "Analysts expect limited short term impact."
+    ],
+    "bias": "Low"
+}
+
+
+@dataclass
+class FakeSettings:
+    seed: int = 1
+    feed_size: int = 10
+    feed_latency: float = 0.05
+    page_latency: float = 0.02
+    page_paragraphs: int = 8
+    openai_latency: float = 0.4
+    openai_stream_delay: float = 0.01
+    # requests per minute before answering 429, enforced over openai_rpm_window seconds (0 = no limit)
+    openai_rpm: int = 0
+    openai_rpm_window: float = 10
+    calls: dict = field(default_factory=dict)
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def create_app(fake: FakeSettings) -> FastAPI:
+    app = FastAPI()
+
+    def count(name: str):
+        fake.calls[name] = fake.calls.get(name, 0) + 1
+
+    openai_requests = deque()
+
+    def over_limit() -> bool:
+        if fake.openai_rpm <= 0:
+            return False
+
+        now = time.monotonic()
+        while openai_requests and openai_requests[0] < now - fake.openai_rpm_window:
+            openai_requests.popleft()
+
+        if len(openai_requests) >= max(1, fake.openai_rpm * fake.openai_rpm_window / 60):
+            return True
+        openai_requests.append(now)
+        return False
+
+    @app.get("/api/1/latest")
+    async def latest(request: Request, q: str = ""):
+        count("newsdata")
+        await asyncio.sleep(fake.feed_latency)
+
+        base = str(request.base_url).rstrip("/")
+        results = []
+        for index in range(fake.feed_size):
+            slug = f"{q.lower()}-{index}"
+            rng = random.Random(f"{fake.seed}:{slug}")
+            results.append({
+                "title": _sentence(rng, 8),
+                "description": _paragraph(rng, 5),
+                "image_url": f"{base}/site/{slug}.jpg",
+                "source_name": rng.choice(["Wire", "Daily", "Herald", "Times", "Post"]),
+                "link": f"{base}/site/{slug}.html"
+            })
+
+        return {"status": "success", "totalResults": len(results), "results": results}
+
+    @app.get("/site/{slug}.html", response_class=HTMLResponse)
+    async def page(slug: str):
+        count("site")
+        await asyncio.sleep(fake.page_latency)
+
+        rng = random.Random(f"{fake.seed}:{slug}")
+        title = _sentence(rng, 8)
+        body = "".join(f"<p>{_paragraph(rng)}</p>" for _ in range(fake.page_paragraphs))
+
+        return (
+            f"<html><head><title>{title}</title>"
+            f'<meta property="og:title" content="{title}">'
+            f'<meta property="og:image" content="/site/{slug}.jpg">'
+            f'<meta name="author" content="Bench Reporter">'
+            f'<meta property="article:published_time" content="2024-01-01T00:00:00Z">'
+            f"</head><body><article><h1>{title}</h1>{body}</article></body></html>"
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+
+        if over_limit():
+            count("openai_429")
+            retry_after = openai_requests[0] + fake.openai_rpm_window - time.monotonic()
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(max(1, math.ceil(retry_after)))}
+            )
+        count("openai")
+
+        messages = payload.get("messages", [])
+        prompt_tokens = sum(len(message.get("content", "")) for message in messages) // 4
+
+        # chunk prompts of the map step ask for {"points": [...]}
+        if messages and '"points"' in messages[-1].get("content", ""):
+            content = json.dumps({"points": SUMMARY["summary"][:2]})
+        else:
+            content = json.dumps(SUMMARY)
+
+        if payload.get("stream"):
+            async def stream():
+                await asyncio.sleep(fake.openai_latency / 2)
+                for start in range(0, len(content), 8):
+                    await asyncio.sleep(fake.openai_stream_delay)
+                    chunk = {
+                        "id": "bench",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": payload.get("model"),
+                        "choices": [{"index": 0, "delta": {"content": content[start:start + 8]}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        await asyncio.sleep(fake.openai_latency)
+        return {
+            "id": "bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4
+            }
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeServices:
+    def __init__(self, fake: FakeSettings):
+        self.fake = fake
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(uvicorn.Config(
+            create_app(fake),
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            access_log=False
+        ))
+        self._thread = threading.Thread(target=self._server.run, name="bench-fakes", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
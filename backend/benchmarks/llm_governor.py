@@ -0,0 +1,100 @@
+# Benchmark for the OpenAI rate governor.
+#
+# Runs summarize_article against the fake OpenAI from benchmarks/fakes.py with a requests per
+# minute limit that answers 429 when exceeded. A burst of background calls (like prefetching)
+# is queued first, then interactive calls arrive at a steady rate. Reports throughput against
+# the limit, the number of 429s and latency per priority.
+#
+#   python -m benchmarks.llm_governor --provider-rpm 600 --background 100 --interactive 40
+#   python -m benchmarks.llm_governor --provider-rpm 600 --governor-rpm 0    # buckets off, 429s only
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from benchmarks.fakes import FakeServices, FakeSettings, _paragraph
+from benchmarks.stats import percentile
+
+
+async def run(args):
+    from utils.llm_governor import background_priority, get_governor
+    from utils.summarizer import close_client, summarize_article
+
+    rng = random.Random(args.seed)
+    texts = [" ".join(_paragraph(rng) for _ in range(4)) for _ in range(args.background + args.interactive)]
+    latencies = {"interactive": [], "background": []}
+    failures = {"interactive": 0, "background": 0}
+
+    async def call(kind: str, text: str):
+        started = time.perf_counter()
+        result = await summarize_article(text)
+        latencies[kind].append(time.perf_counter() - started)
+        if result is None:
+            failures[kind] += 1
+
+    async def background(text: str):
+        with background_priority():
+            await call("background", text)
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(background(text)) for text in texts[:args.background]]
+
+    # users keep coming while the backlog is worked off
+    for text in texts[args.background:]:
+        await asyncio.sleep(args.interactive_interval)
+        tasks.append(asyncio.create_task(call("interactive", text)))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    governor = get_governor()
+    await close_client()
+    return elapsed, latencies, failures, governor.limit
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI rate governor benchmark")
+    parser.add_argument("--provider-rpm", type=int, default=600, help="limit enforced by the fake provider")
+    parser.add_argument("--governor-rpm", type=int, help="OPENAI_RPM_LIMIT, defaults to --provider-rpm")
+    parser.add_argument("--governor-tpm", type=int, default=0, help="OPENAI_TPM_LIMIT, the fake provider has no token limit")
+    parser.add_argument("--background", type=int, default=100, help="calls queued up front at background priority")
+    parser.add_argument("--interactive", type=int, default=40, help="interactive calls arriving during the run")
+    parser.add_argument("--interactive-interval", type=float, default=0.1, help="seconds between interactive calls")
+    parser.add_argument("--concurrency", type=int, default=16, help="OPENAI_MAX_CONCURRENCY")
+    parser.add_argument("--openai-latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    governor_rpm = args.provider_rpm if args.governor_rpm is None else args.governor_rpm
+    fake = FakeSettings(seed=args.seed, openai_latency=args.openai_latency, openai_rpm=args.provider_rpm)
+
+    with FakeServices(fake) as fakes:
+        # settings are read at import time, so they are set before anything imports them
+        os.environ["OPENAI_BASE_URL"] = f"{fakes.url}/v1"
+        os.environ["OPENAI_API_KEY"] = "bench"
+        os.environ["OPENAI_RPM_LIMIT"] = str(governor_rpm)
+        os.environ["OPENAI_TPM_LIMIT"] = str(args.governor_tpm)
+        os.environ["OPENAI_MAX_CONCURRENCY"] = str(args.concurrency)
+        os.environ["SUMMARY_TIER"] = "llm"
+
+        elapsed, latencies, failures, limit = asyncio.run(run(args))
+
+    calls = args.background + args.interactive
+    print(f"calls: {calls} in {elapsed:.1f}s, {calls / elapsed * 60:.0f}/min against a limit of {args.provider_rpm}/min")
+    print(f"provider: {fake.calls.get('openai', 0)} answered, {fake.calls.get('openai_429', 0)} rate limited")
+    print(f"final concurrency limit: {limit:.1f}")
+
+    print(f"\n{'priority':<12} {'calls':>6} {'failed':>6} {'p50 s':>8} {'p95 s':>8} {'max s':>8}")
+    for kind, values in latencies.items():
+        if values:
+            print(
+                f"{kind:<12} {len(values):>6} {failures[kind]:>6} {percentile(values, 50):>8.2f} "
+                f"{percentile(values, 95):>8.2f} {max(values):>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# Offline load test for the API.
+#
+# Runs the app in process against local fakes for newsdata.io, article pages and OpenAI
+# (see benchmarks/fakes.py), drives a weighted mix of feed, detail, summarize, save and
+# login traffic from a number of virtual users, and reports throughput and p50/p95/p99
+# per endpoint. Results can be written as JSON and compared against an earlier run.
+#
+# Mongo comes from MONGODB_URL with data in DB_NAME (defaults to news_app_bench, which is
+# wiped at the start of every run). --mongo memory uses mongomock-motor instead, when it
+# is installed, which is handy for a quick run but says little about database latency.
+#
+#   python -m benchmarks.load_test --duration 30 --users 20 --output baseline.json
+#   python -m benchmarks.load_test --duration 30 --users 20 --baseline baseline.json --max-regression 0.2
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+os.environ.setdefault("DB_NAME", "news_app_bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+import httpx
+
+from benchmarks.fakes import FakeServices, FakeSettings
+from benchmarks.stats import percentile
+
+CATEGORIES = ["technology", "business", "sports", "health", "science", "world"]
+
+DEFAULT_MIX = "feed=40,detail=25,summarize=15,save=10,login=10"
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+
+    unknown = set(weights) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"unknown operations in --mix: {', '.join(sorted(unknown))}")
+
+    return weights
+
+
+def _article_body(item: dict) -> dict:
+    return {
+        "title": item["title"],
+        "description": item["description"],
+        "image_url": item["image_url"],
+        "source": item["source"],
+        "article_url": item["article_url"]
+    }
+
+
+async def op_feed(user, rng, items):
+    return await user["client"].get(f"/api/articles/{rng.choice(CATEGORIES)}")
+
+
+async def op_detail(user, rng, items):
+    item = rng.choice(items)
+    return await user["client"].get(
+        "/api/articles/detail",
+        params={"article_url": item["article_url"], "source": item["source"]}
+    )
+
+
+async def op_summarize(user, rng, items):
+    return await user["client"].post("/api/articles/summarize", json=_article_body(rng.choice(items)))
+
+
+async def op_save(user, rng, items):
+    return await user["client"].post("/api/articles/save-article", json=_article_body(rng.choice(items)))
+
+
+async def op_login(user, rng, items):
+    return await user["client"].post(
+        "/api/users/login",
+        json={"emailOrUsername": user["username"], "password": user["password"]}
+    )
+
+
+OPERATIONS = {
+    "feed": op_feed,
+    "detail": op_detail,
+    "summarize": op_summarize,
+    "save": op_save,
+    "login": op_login
+}
+
+
+def use_memory_mongo():
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("--mongo memory needs the mongomock-motor package")
+
+    import db.connect_db
+    db.connect_db.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient()
+
+
+async def reset_database():
+    import db.connect_db
+    from core.config import settings
+
+    # never wipe a database that does not look like a benchmark one
+    if "bench" not in settings.DB_NAME:
+        raise SystemExit(f"refusing to wipe DB_NAME={settings.DB_NAME}, use a name containing 'bench'")
+
+    client = db.connect_db.AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(settings.DB_NAME)
+    client.close()
+
+
+async def create_user(transport, index: int) -> dict:
+    user = {
+        "username": f"bench_{index}",
+        "password": "bench-password"
+    }
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120)
+
+    await client.post("/api/users/register", json={
+        "first_name": "Bench",
+        "last_name": str(index),
+        "username": user["username"],
+        "email": f"bench_{index}@example.com",
+        "password": user["password"]
+    })
+    response = await client.post(
+        "/api/users/login",
+        json={"emailOrUsername": user["username"], "password": user["password"]}
+    )
+    response.raise_for_status()
+
+    # the auth cookies are marked secure, so they are handed over explicitly instead of by the cookie jar
+    client.cookies.set("access_token", response.cookies["access_token"])
+    user["client"] = client
+    return user
+
+
+async def run(args) -> dict:
+    fake = FakeSettings(
+        seed=args.seed,
+        feed_latency=args.feed_latency,
+        page_latency=args.page_latency,
+        openai_latency=args.openai_latency
+    )
+    mix = parse_mix(args.mix)
+
+    with FakeServices(fake) as fakes:
+        # settings are read at import time, so the app is imported only once the fakes are up
+        os.environ["NEWSDATA_API_URL"] = f"{fakes.url}/api/1/latest"
+        os.environ["NEWSAPI_API_KEY"] = "bench"
+        os.environ["OPENAI_BASE_URL"] = f"{fakes.url}/v1"
+        os.environ["OPENAI_API_KEY"] = "bench"
+        os.environ["PREFETCH_ENABLED"] = "False"
+
+        if args.mongo == "memory":
+            use_memory_mongo()
+        await reset_database()
+
+        from db.connect_db import lifespan
+        from main import app
+
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            users = await asyncio.gather(*(create_user(transport, index) for index in range(args.users)))
+
+            # the article pool comes from the feeds themselves, like a user clicking through
+            items = []
+            for category in CATEGORIES:
+                response = await users[0]["client"].get(f"/api/articles/{category}")
+                response.raise_for_status()
+                items.extend(response.json())
+
+            latencies = defaultdict(list)
+            errors = Counter()
+            names = list(mix)
+            weights = [mix[name] for name in names]
+
+            started = time.perf_counter()
+            deadline = started + args.duration
+
+            async def virtual_user(index: int, user: dict):
+                rng = random.Random(args.seed * 1000 + index)
+                while time.perf_counter() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    request_started = time.perf_counter()
+                    try:
+                        response = await OPERATIONS[name](user, rng, items)
+                        failed = response.status_code >= 400
+                    except Exception as e:
+                        print(f"{name} failed", e)
+                        failed = True
+                    latencies[name].append(time.perf_counter() - request_started)
+                    if failed:
+                        errors[name] += 1
+
+            await asyncio.gather(*(virtual_user(index, user) for index, user in enumerate(users)))
+            elapsed = time.perf_counter() - started
+
+            for user in users:
+                await user["client"].aclose()
+
+    endpoints = {}
+    for name in names:
+        values = latencies[name]
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2)
+        }
+
+    everything = [value for values in latencies.values() for value in values]
+    endpoints["all"] = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "rps": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 50) * 1000, 2),
+        "p95_ms": round(percentile(everything, 95) * 1000, 2),
+        "p99_ms": round(percentile(everything, 99) * 1000, 2)
+    }
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": args.duration,
+            "users": args.users,
+            "mix": mix,
+            "seed": args.seed,
+            "mongo": args.mongo,
+            "openai_latency": args.openai_latency,
+            "upstream_calls": dict(fake.calls)
+        },
+        "endpoints": endpoints
+    }
+
+
+def print_report(results: dict):
+    print(f"{'endpoint':<10} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results["endpoints"].items():
+        print(
+            f"{name:<10} {row['requests']:>8} {row['errors']:>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+        )
+    print(f"upstream calls: {results['meta']['upstream_calls']}")
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    # latencies regress when they grow, throughput when it drops
+    for key in ("users", "mix", "mongo", "openai_latency"):
+        if baseline.get("meta", {}).get(key) != results["meta"][key]:
+            print(f"warning: baseline was recorded with a different {key}")
+
+    print(f"\n{'endpoint':<10} {'metric':<7} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressed = False
+
+    for name, row in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            before, after = previous[metric], row[metric]
+            if not before:
+                continue
+
+            change = (after - before) / before
+            worse = -change if metric == "rps" else change
+            flag = " !" if worse > max_regression else ""
+            regressed = regressed or bool(flag)
+
+            print(f"{name:<10} {metric:<7} {before:>10.1f} {after:>10.1f} {change:>+7.0%}{flag}")
+
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of traffic")
+    parser.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted operations, e.g. feed=40,detail=25")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mongo", choices=["url", "memory"], default="url")
+    parser.add_argument("--feed-latency", type=float, default=0.05)
+    parser.add_argument("--page-latency", type=float, default=0.02)
+    parser.add_argument("--openai-latency", type=float, default=0.4)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
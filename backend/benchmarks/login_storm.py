@@ -0,0 +1,98 @@
+# Login storm benchmark.
+#
+# Fires concurrent logins at the app while probing /health, and reports login throughput
+# plus p50/p99 latency of the unrelated endpoint. Compare the process pool against the old
+# inline argon2 path with --inline. Needs a MongoDB at MONGODB_URL, data goes to DB_NAME
+# (defaults to news_app_bench).
+#
+#   python -m benchmarks.login_storm --logins 200 --concurrency 32
+#   python -m benchmarks.login_storm --logins 200 --concurrency 32 --inline
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DB_NAME", "news_app_bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+import httpx
+
+from benchmarks.stats import percentile
+import routes.users as users_routes
+from db.connect_db import lifespan
+from main import app
+from utils.auth import verify_and_update_password
+
+USER = {
+    "first_name": "Bench",
+    "last_name": "User",
+    "username": "bench_user",
+    "email": "bench_user@example.com",
+    "password": "bench-password"
+}
+
+
+async def run(logins: int, concurrency: int, inline: bool):
+    if inline:
+        # the pre-pool behaviour: argon2 runs directly on the event loop
+        async def verify_inline(password, hashed):
+            return verify_and_update_password(password, hashed)
+
+        users_routes.verify_and_update_password_async = verify_inline
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/api/users/register", json=USER)
+
+            stop = asyncio.Event()
+            probe_latencies = []
+            login_latencies = []
+            limit = asyncio.Semaphore(concurrency)
+
+            async def probe():
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    await client.get("/health")
+                    probe_latencies.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.01)
+
+            async def login():
+                async with limit:
+                    started = time.perf_counter()
+                    response = await client.post(
+                        "/api/users/login",
+                        json={"emailOrUsername": USER["username"], "password": USER["password"]}
+                    )
+                    login_latencies.append(time.perf_counter() - started)
+                    response.raise_for_status()
+
+            probe_task = asyncio.create_task(probe())
+            started = time.perf_counter()
+            await asyncio.gather(*(login() for _ in range(logins)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await probe_task
+
+    mode = "inline" if inline else "process pool"
+    print(f"mode:               {mode}")
+    print(f"logins:             {logins} in {elapsed:.2f}s ({logins / elapsed:.1f}/s)")
+    print(f"login p50 / p99:    {percentile(login_latencies, 50) * 1000:.1f} / {percentile(login_latencies, 99) * 1000:.1f} ms")
+    print(f"/health samples:    {len(probe_latencies)}")
+    print(f"/health p50 / p99:  {percentile(probe_latencies, 50) * 1000:.1f} / {percentile(probe_latencies, 99) * 1000:.1f} ms")
+    print(f"/health mean:       {statistics.fmean(probe_latencies) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login storm benchmark")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop, as before the pool")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.logins, args.concurrency, args.inline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# Micro-benchmark for response serialization on the hot endpoints.
+#
+# Compares, for synthetic payloads shaped like real responses:
+#
+#   encoder    jsonable_encoder + json.dumps, what FastAPI does for routes without a response model
+#   model      validate into the declared response model and dump_json, FastAPI's path with one
+#   orjson     orjson.dumps of the raw dicts, for reference (only when orjson is installed)
+#
+#   python -m benchmarks.serialization --rounds 200
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.fakes import WORDS, _paragraph, _sentence
+from benchmarks.stats import percentile
+from schemas.articles import ArticleDetailResponse, FeedArticle, SavedArticlesPage, SearchResults
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _article(rng: random.Random, index: int) -> dict:
+    return {
+        "title": _sentence(rng, 8),
+        "description": _paragraph(rng, 3),
+        "image_url": f"https://example.com/{index}.jpg",
+        "source": rng.choice(["Wire", "Daily", "Herald", "Times", "Post"]),
+        "article_url": f"https://example.com/{rng.choice(WORDS)}-{index}.html",
+        "summary": [_sentence(rng) for _ in range(5)],
+        "bias": rng.choice(["Low", "Medium", "High"]),
+        "created_at": datetime(2024, 1, 1) + timedelta(minutes=index)
+    }
+
+
+def build_payloads(seed: int) -> dict:
+    rng = random.Random(seed)
+
+    saved = [_article(rng, index) for index in range(100)]
+    feed = [
+        {key: item[key] for key in ("title", "description", "image_url", "source", "article_url")}
+        for item in saved[:10]
+    ]
+    feed[0]["duplicates"] = [{"source": "Wire", "article_url": "https://example.com/copy.html"}]
+
+    return {
+        "saved-articles (100)": (
+            SavedArticlesPage,
+            {"items": saved, "next_cursor": "eyJzYXZlZF9hdCI6IC4uLn0", "total": 250}
+        ),
+        "detail (long text)": (
+            ArticleDetailResponse,
+            {
+                "title": _sentence(rng, 8),
+                "text": "\n\n".join(_paragraph(rng, 6) for _ in range(60)),
+                "image": "https://example.com/lead.jpg",
+                "source": "Herald",
+                "authors": ["Bench Reporter", "Second Author"],
+                "published_date": "2024-01-01T00:00:00+00:00"
+            }
+        ),
+        "feed (10)": (List[FeedArticle], feed),
+        "search (50)": (
+            SearchResults,
+            {"items": [dict(item, score=rng.random() * 10) for item in saved[:50]], "next_cursor": None}
+        )
+    }
+
+
+def _time(fn, rounds: int) -> List[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization micro-benchmark")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'payload':<22} {'method':<8} {'p50 us':>9} {'p95 us':>9} {'bytes':>8}")
+    for name, (model, payload) in build_payloads(args.seed).items():
+        adapter = TypeAdapter(model)
+
+        methods = {
+            "encoder": lambda: json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8"),
+            "model": lambda: adapter.dump_json(adapter.validate_python(payload))
+        }
+        if orjson is not None:
+            methods["orjson"] = lambda: orjson.dumps(payload)
+
+        for method, fn in methods.items():
+            samples = _time(fn, args.rounds)
+            print(
+                f"{name:<22} {method:<8} {percentile(samples, 50) * 1e6:>9.0f} "
+                f"{percentile(samples, 95) * 1e6:>9.0f} {len(fn()):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
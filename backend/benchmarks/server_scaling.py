@@ -0,0 +1,144 @@
+# Multi-worker scaling benchmark.
+#
+# Starts server.py with 1, 2, 4, ... workers (feeds come from the local fakes in
+# benchmarks/fakes.py), drives it from several client processes so the load generator is
+# not the bottleneck, and reports throughput and latency per worker count. Needs a
+# MongoDB at MONGODB_URL, the app only uses DB_NAME (defaults to news_app_bench) for startup.
+#
+#   python -m benchmarks.server_scaling --workers 1,2,4 --duration 10 --connections 64
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.fakes import FakeServices, FakeSettings, _free_port
+from benchmarks.stats import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _drive(url: str, paths: list, connections: int, duration: float) -> list:
+    latencies = []
+    failures = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        async def connection(index: int):
+            nonlocal failures
+            request = index
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[request % len(paths)])
+                    if response.status_code >= 400:
+                        failures += 1
+                except httpx.HTTPError:
+                    failures += 1
+                latencies.append(time.perf_counter() - started)
+                request += 1
+
+        await asyncio.gather(*(connection(index) for index in range(connections)))
+
+    return [latencies, failures]
+
+
+def _client_process(url: str, paths: list, connections: int, duration: float, results):
+    results.put(asyncio.run(_drive(url, paths, connections, duration)))
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("server exited during startup")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("server did not come up")
+
+
+def measure(workers: int, args, fakes_url: str) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "SERVER_WORKERS": str(workers),
+        "SERVER_PORT": str(port),
+        "SERVER_HOST": "127.0.0.1",
+        "NEWSDATA_API_URL": f"{fakes_url}/api/1/latest",
+        "NEWSAPI_API_KEY": "bench",
+        "PREFETCH_ENABLED": "False"
+    }
+    env.setdefault("DB_NAME", "news_app_bench")
+    env.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=BACKEND_DIR, env=env)
+    try:
+        _wait_until_up(url, server)
+
+        # warm every worker's feed cache so the run measures the app, not the fake upstream
+        paths = args.paths.split(",")
+        asyncio.run(_drive(url, paths, args.connections, 2))
+
+        results = multiprocessing.Queue()
+        per_client = max(1, args.connections // args.clients)
+        clients = [
+            multiprocessing.Process(target=_client_process, args=(url, paths, per_client, args.duration, results))
+            for _ in range(args.clients)
+        ]
+        for client in clients:
+            client.start()
+        collected = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+    finally:
+        # SIGTERM, the same graceful shutdown a deploy would trigger
+        server.terminate()
+        server.wait(timeout=60)
+
+    latencies = [value for values, _ in collected for value in values]
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "failures": sum(failures for _, failures in collected),
+        "rps": len(latencies) / args.duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker scaling benchmark")
+    parser.add_argument("--workers", default="1,2,4", help="worker counts to compare")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=64, help="concurrent connections in total")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="load generator processes")
+    parser.add_argument("--paths", default="/health,/api/articles/technology,/api/articles/sports")
+    args = parser.parse_args()
+
+    rows = []
+    with FakeServices(FakeSettings(feed_latency=0)) as fakes:
+        for workers in [int(value) for value in args.workers.split(",")]:
+            rows.append(measure(workers, args, fakes.url))
+
+    print(f"cpu cores: {os.cpu_count()}")
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'failures':>8}")
+    for row in rows:
+        speedup = row["rps"] / rows[0]["rps"] if rows[0]["rps"] else 0
+        print(
+            f"{row['workers']:>7} {row['rps']:>9.0f} {speedup:>7.2f}x "
+            f"{row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['failures']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
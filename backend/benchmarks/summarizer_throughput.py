@@ -0,0 +1,97 @@
+# Summarizer throughput benchmark.
+#
+# Summarizes the same article with the local extractive tier and with the llm path, and
+# reports throughput plus p50/p99 latency for each. The llm side talks to whatever
+# OPENAI_BASE_URL points at, so it can run against a local fake server. Pass --skip-llm to
+# time the local tier only, or --file to use a real article instead of the generated one.
+#
+#   python -m benchmarks.summarizer_throughput --requests 200 --concurrency 16
+#   python -m benchmarks.summarizer_throughput --file article.txt --skip-llm
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from benchmarks.stats import percentile
+from utils.extractive import summarize_locally
+from utils.summarizer import close_client, summarize_article
+
+TOPICS = ["the council", "investors", "the company", "researchers", "officials", "the union"]
+VERBS = ["announced", "rejected", "questioned", "approved", "delayed", "defended"]
+OBJECTS = ["the budget", "a new plan", "the merger", "the proposal", "the findings", "the deal"]
+
+
+def generate_article(sentences: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    return " ".join(
+        f"{rng.choice(TOPICS).capitalize()} {rng.choice(VERBS)} {rng.choice(OBJECTS)} "
+        f"on day {index} after {rng.choice(TOPICS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}."
+        for index in range(sentences)
+    )
+
+
+async def measure(name: str, fn, requests: int, concurrency: int):
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with limit:
+            started = time.perf_counter()
+            result = await fn()
+            latencies.append(time.perf_counter() - started)
+            if not result:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:>6}: {requests / elapsed:8.1f} req/s  "
+        f"p50 {percentile(latencies, 50) * 1000:8.2f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:8.2f} ms  "
+        f"failures {failures}"
+    )
+
+
+async def run(text: str, requests: int, concurrency: int, skip_llm: bool):
+    print(f"article: {len(text.split())} words")
+
+    # the local tier is cpu bound, so it runs inline exactly as the service calls it
+    async def local():
+        return summarize_locally(text)
+
+    await measure("local", local, requests, concurrency)
+
+    if not skip_llm:
+        try:
+            await measure("llm", lambda: summarize_article(text), requests, concurrency)
+        finally:
+            await close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=60)
+    parser.add_argument("--file")
+    parser.add_argument("--skip-llm", action="store_true")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = generate_article(args.sentences)
+
+    asyncio.run(run(text, args.requests, args.concurrency, args.skip_llm))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     DB_NAME: str = "news_app"
 
     NEWSAPI_API_KEY: str = ""
+    NEWSDATA_API_URL: str = "https://newsdata.io/api/1/latest"
     MONGODB_URL: str = ""
     JWT_SECRET_KEY: str = "" 
     OPENAI_API_KEY: str = ""
@@ -19,6 +20,112 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # changing these rehashes each password transparently on its next login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2
+
+    ADMIN_API_KEY: str = ""
+
+    # production launcher (server.py), main.py stays the single process dev server
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1  # 0 starts one worker per cpu core
+    SERVER_LOOP: str = "auto"  # "auto" picks uvloop when installed, or "uvloop" / "asyncio"
+    SERVER_HTTP: str = "auto"  # "auto" picks httptools when installed, or "httptools" / "h11"
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5  # keep below the idle timeout of any load balancer in front
+    SERVER_LIMIT_CONCURRENCY: int = 0  # per worker, 0 means unlimited, excess requests get a 503
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30  # time for in-flight requests after SIGTERM
+    SERVER_PROXY_HEADERS: bool = True
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    SERVER_ACCESS_LOG: bool = False
+    SHUTDOWN_DRAIN_SECONDS: float = 20  # then background llm and scrape calls, before mongo closes
+
+    USER_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # "memory" keeps the article, feed and summary caches in each process, "redis" shares them
+    CACHE_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_NAMESPACE: str = "news"
+
+    ARTICLE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ARTICLE_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    ARTICLE_CACHE_NEGATIVE_TTL_SECONDS: int = 5 * 60
+
+    # scraped pages are also kept in mongo, so restarts do not hit publishers again
+    SCRAPED_CONTENT_ENABLED: bool = True
+    SCRAPED_CONTENT_FRESH_SECONDS: int = 6 * 60 * 60  # served without asking the publisher
+    SCRAPED_CONTENT_TTL_SECONDS: int = 7 * 24 * 60 * 60  # removed by a ttl index after this long unconfirmed
+    SCRAPED_CONTENT_COMPRESSION_LEVEL: int = 6
+
+    SCRAPER_EXECUTOR: str = "thread"  # "thread" or "process"
+    SCRAPER_MAX_WORKERS: int = 8
+    SCRAPER_MAX_CONCURRENCY: int = 8
+    SCRAPER_MAX_PER_DOMAIN: int = 2
+    SCRAPER_TIMEOUT_SECONDS: float = 15
+
+    OPENAI_BASE_URL: str = ""  # leave empty for api.openai.com
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_MAX_CONCURRENCY: int = 8  # ceiling of the adaptive concurrency limit
+    OPENAI_MIN_CONCURRENCY: int = 1
+    OPENAI_TARGET_LATENCY_SECONDS: float = 10  # slower calls shrink the concurrency limit, 0 reacts to 429s only
+    # account limits, every call waits for room in both (0 turns a limit off)
+    OPENAI_RPM_LIMIT: int = 500
+    OPENAI_TPM_LIMIT: int = 200000
+    OPENAI_DEFAULT_COMPLETION_TOKENS: int = 500  # assumed completion size for calls without max_tokens
+    OPENAI_TIMEOUT_SECONDS: float = 30
+    OPENAI_MAX_RETRIES: int = 3
+    OPENAI_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    OPENAI_RETRY_MAX_DELAY_SECONDS: float = 8
+
+    # long articles are split into chunks, summarized concurrently and reduced to the final bullets
+    SUMMARY_ARTICLE_TOKEN_BUDGET: int = 6000
+    SUMMARY_CHUNK_TOKENS: int = 1500
+    TOKENIZER_LOAD_TIMEOUT_SECONDS: float = 15  # startup wait for the tiktoken encoding, then token counts are estimated
+    SUMMARY_MAP_CONCURRENCY: int = 4
+
+    # "llm", "local" (extractive, no api calls) or "auto": local for short articles, llm otherwise
+    SUMMARY_TIER: str = "auto"
+    SUMMARY_LOCAL_MAX_WORDS: int = 0  # 0 sends every article to the llm in auto mode
+    SUMMARY_LLM_LATENCY_BUDGET_SECONDS: float = 0  # 0 waits for the llm as long as it takes
+    SUMMARY_LOCAL_FALLBACK: bool = True  # answer with the local summary when the llm fails
+
+    SUMMARIZE_BATCH_MAX_ITEMS: int = 50
+    SUMMARIZE_BATCH_CONCURRENCY: int = 4
+
+    HTTP_TIMEOUT_SECONDS: float = 10
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    HTTP2_ENABLED: bool = False  # needs the optional h2 package
+
+    FEED_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    FEED_CACHE_TTL_SECONDS: int = 5 * 60
+    FEED_CACHE_STALE_SECONDS: int = 15 * 60
+
+    # in front of the summary_cache collection
+    SUMMARY_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    SUMMARY_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+
+    # syndicated copies of a story are collapsed in feeds and share one scrape and summary
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.6  # estimated jaccard similarity of title + description shingles
+    DEDUP_INDEX_MAX_ENTRIES: int = 20000
+
+    METRICS_ENABLED: bool = True  # prometheus text format on /metrics
+    SERVER_TIMING_ENABLED: bool = True  # per-stage timings in a Server-Timing response header
+
+    SEARCH_MAX_RESULTS: int = 500  # deepest result a search can page to
+
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_CATEGORIES: str = "technology,business,sports,health,entertainment,science"
+    PREFETCH_INTERVAL_SECONDS: int = 10 * 60
+    PREFETCH_TOP_N: int = 5
+    PREFETCH_MAX_LLM_CALLS_PER_HOUR: int = 60
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
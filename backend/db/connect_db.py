@@ -1,3 +1,5 @@
+import asyncio
+import httpx
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from contextlib import asynccontextmanager
@@ -5,25 +7,70 @@ from fastapi import FastAPI
 from core.config import settings
 from models.user import User
 from models.article import Article
+from models.saved_article import SavedArticle
+from models.scraped_content import ScrapedContent
+from models.summary_cache import SummaryCache
+from services.feed_service import FEED_FLIGHTS
+from services.prefetch_service import PrefetchScheduler
+from services.scrape_service import SCRAPE_FLIGHTS
+from services.summary_service import SUMMARY_FLIGHTS
+from utils.auth import shutdown_hash_executor
+from utils.cache import close_redis
+from utils.metrics import MongoTimingListener
+from utils.scraper import shutdown_executor
+from utils.summarizer import close_client
+from utils.tokens import load_tokenizer
 
 
 # define a lifespan method for fastapi
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await startup_db_client(app)  # start the database connection
+    startup_http_client(app)  # shared pooled client for outbound api calls
+    await load_tokenizer(settings.TOKENIZER_LOAD_TIMEOUT_SECONDS)  # off the event loop, before the first summary
+
+    # warm feeds, scraped text and summaries in the background
+    app.state.prefetch = None
+    if settings.PREFETCH_ENABLED:
+        app.state.prefetch = PrefetchScheduler(app.state.http_client)
+        app.state.prefetch.start()
+
     yield
 
+    if app.state.prefetch:
+        await app.state.prefetch.stop()
+    await drain_background_work()  # let shared scrapes and llm calls finish their db writes
+    await shutdown_http_client(app)  # close the shared http client
+    shutdown_executor()  # stop the scraper worker pool
+    shutdown_hash_executor()  # stop the password hashing pool
+    await close_client()  # close the pooled openai connections
+    await close_redis()  # close the shared cache connection, if one was opened
     await shutdown_db_client(app)  # close the database connection
 
 
+# wait for work that outlives its request (shielded single-flight calls, feed refreshes)
+async def drain_background_work():
+    pending = SCRAPE_FLIGHTS.pending() + SUMMARY_FLIGHTS.pending() + FEED_FLIGHTS.pending()
+    if not pending:
+        return
+
+    print(f"Draining {len(pending)} background calls")
+    _, unfinished = await asyncio.wait(pending, timeout=settings.SHUTDOWN_DRAIN_SECONDS)
+
+    for task in unfinished:
+        task.cancel()
+    if unfinished:
+        print(f"Cancelled {len(unfinished)} background calls after {settings.SHUTDOWN_DRAIN_SECONDS}s")
+
+
 # method for starting the mongodb connection
 async def startup_db_client(app: FastAPI):
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[MongoTimingListener()])
     app.state.mongodb_client = client
 
     await init_beanie(
         database=client[settings.DB_NAME],
-        document_models=[User, Article]
+        document_models=[User, Article, SavedArticle, SummaryCache, ScrapedContent]
     )
 
     print("MongoDB connected")
@@ -33,3 +80,29 @@ async def startup_db_client(app: FastAPI):
 async def shutdown_db_client(app: FastAPI):
     app.state.mongodb_client.close()
     print("MongoDB disconnected")
+
+
+# method for creating the shared outbound http client
+def startup_http_client(app: FastAPI):
+    http2 = settings.HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("HTTP2_ENABLED is set but h2 is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+    app.state.http_client = httpx.AsyncClient(
+        http2=http2,
+        timeout=settings.HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+    )
+
+
+# method for closing the shared outbound http client
+async def shutdown_http_client(app: FastAPI):
+    await app.state.http_client.aclose()
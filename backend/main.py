@@ -1,9 +1,11 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from core.config import settings
-from routes import articles, users
+from routes import admin, articles, users
 from db.connect_db import lifespan
+from utils.metrics import MetricsMiddleware, render_metrics
 
 app = FastAPI(
     title="News summarizer API",
@@ -19,15 +21,25 @@ app.add_middleware(
     allow_origins=settings.ALLOWED_ORIGINS.split(","),
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["Server-Timing"]
 )
 
+# outermost, so the timings cover everything including cors
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/health")
 def health_check():
     return {"status": "alive"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(admin.require_metrics_access)])
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(articles.router, prefix=settings.API_PREFIX)
 app.include_router(users.router, prefix=settings.API_PREFIX)
+app.include_router(admin.router, prefix=settings.API_PREFIX)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,15 +1,16 @@
 from beanie import Document, Indexed
 from pydantic import Field
+from pymongo import TEXT, IndexModel
 from typing import Optional, List
 from datetime import datetime
 from bson import ObjectId
 
 
 class Article(Document):
-    title: str
+    title: Optional[str]
     description: Optional[str]
     image_url: Optional[str]
-    source: str
+    source: Optional[str]
     summary: Optional[List[str]] = []
     bias: Optional[str] = None
 
@@ -19,4 +20,12 @@ class Article(Document):
 
     class Settings:
         name = "articles"
-
+        indexes = [
+            # full text search, a match in the title counts more than one in the summary or description
+            IndexModel(
+                [("title", TEXT), ("summary", TEXT), ("description", TEXT)],
+                name="article_search",
+                weights={"title": 10, "summary": 4, "description": 2},
+                default_language="english"
+            )
+        ]
@@ -0,0 +1,28 @@
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime
+
+
+class SavedArticle(Document):
+    user_id: PydanticObjectId
+    article_url: str
+
+    saved_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "saved_articles"
+        indexes = [
+            # one entry per user and article, also covers the saved-articles-ids query
+            IndexModel([("user_id", ASCENDING), ("article_url", ASCENDING)], unique=True),
+            # keyset pagination in save order
+            IndexModel([("user_id", ASCENDING), ("saved_at", ASCENDING), ("_id", ASCENDING)])
+        ]
+
+
+class SavedArticleUrl(BaseModel):
+    article_url: str
+
+    class Settings:
+        # leaving out _id lets mongo answer from the (user_id, article_url) index alone
+        projection = {"_id": 0, "article_url": 1}
@@ -0,0 +1,39 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from typing import List, Optional
+from datetime import datetime
+from core.config import settings
+
+
+class ScrapedContent(Document):
+    # normalized canonical url, copies of a syndicated story share one document
+    key: str
+    article_url: str
+
+    title: Optional[str] = None
+    # zlib compressed article text
+    body: bytes = b""
+    image: Optional[str] = None
+    authors: List[str] = []
+    published_date: Optional[str] = None
+
+    # validators from the publisher, sent back on re-fetch as a conditional GET
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    # last time the publisher confirmed the content, by a full fetch or a 304
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "scraped_content"
+        indexes = [
+            IndexModel([("key", ASCENDING)], unique=True),
+            # mongo drops content nobody has re-validated for a while
+            # (an existing index keeps its old expiry until changed with collMod)
+            IndexModel(
+                [("fetched_at", ASCENDING)],
+                name="scraped_content_ttl",
+                expireAfterSeconds=settings.SCRAPED_CONTENT_TTL_SECONDS
+            )
+        ]
@@ -0,0 +1,20 @@
+from beanie import Document, Indexed
+from pydantic import Field
+from typing import List
+from datetime import datetime
+
+
+class SummaryCache(Document):
+    # sha256 of model, prompt version and the truncated article text sent to the llm
+    content_hash: str = Indexed(unique=True)
+
+    model: str
+    prompt_version: str
+
+    summary: List[str]
+    bias: str
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "summary_cache"
@@ -1,5 +1,5 @@
 from beanie import Document, Indexed, PydanticObjectId
-from pydantic import EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -15,9 +15,13 @@ class User(Document):
 
     refresh_token: Optional[str] = None
 
-    saved_articles: List[str] = Field(default_factory=list)
-
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "users"  # This is the collection name.
+
+
+# projections, so handlers only load the fields they need
+class UserProfile(BaseModel):
+    username: str
+    email: str
@@ -0,0 +1,31 @@
+import asyncio
+from fastapi import FastAPI
+from core.config import settings
+from db.connect_db import startup_db_client, shutdown_db_client, startup_http_client, shutdown_http_client
+from services.prefetch_service import PrefetchScheduler
+from utils.cache import close_redis
+from utils.scraper import shutdown_executor
+from utils.summarizer import close_client
+from utils.tokens import load_tokenizer
+
+
+# standalone alternative to PREFETCH_ENABLED, so the api workers do not have to run the scheduler
+async def main():
+    app = FastAPI()  # only used to hold the connections on app.state
+
+    await startup_db_client(app)
+    startup_http_client(app)
+    await load_tokenizer(settings.TOKENIZER_LOAD_TIMEOUT_SECONDS)
+
+    try:
+        await PrefetchScheduler(app.state.http_client).run_forever()
+    finally:
+        await shutdown_http_client(app)
+        shutdown_executor()
+        await close_client()
+        await close_redis()
+        await shutdown_db_client(app)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from core.config import settings
+from utils.cache import CACHES
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"]
+)
+
+
+def require_admin(x_admin_key: str | None = Header(default=None)):
+    # admin endpoints are disabled unless an ADMIN_API_KEY is configured
+    if not settings.ADMIN_API_KEY or not x_admin_key or not secrets.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+
+
+def require_metrics_access(
+        authorization: str | None = Header(default=None),
+        x_admin_key: str | None = Header(default=None)
+    ):
+    # the metrics include the cache stats, so they take the same key, prometheus can only send it as a bearer token
+    if authorization and authorization.lower().startswith("bearer "):
+        x_admin_key = authorization[len("bearer "):]
+    require_admin(x_admin_key)
+
+
+@router.get("/cache-stats", dependencies=[Depends(require_admin)])
+async def cache_stats():
+    return {
+        name: cache.stats()
+        for name, cache in CACHES.items()
+    }
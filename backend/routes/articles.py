@@ -1,19 +1,39 @@
+import asyncio
+import json
 from datetime import datetime
+from typing import List
 from beanie import Save
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from openai import OpenAIError
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 from core.config import settings
-import httpx
-from newspaper import Article as NewsArticle
 from beanie.odm.operators.find.logical import Or
-from beanie.operators import In
-from models.user import User
-from models.article import Article
 from routes.users import get_current_user
-from schemas.articles import SaveArticleRequest, SummaryRequest
-from services.article_service import save_article_for_user
-from utils.summarizer import summarize_article
+from schemas.articles import (
+    ArticleDetailResponse,
+    FeedArticle,
+    SaveArticleRequest,
+    SavedArticlesPage,
+    SearchResults,
+    SummaryRequest,
+    SummaryResponse
+)
+from services.article_service import (
+    InvalidListingQuery,
+    find_summarized_article,
+    find_summarized_articles,
+    list_saved_articles,
+    parse_fields,
+    save_article_for_user,
+    search_articles
+)
+from services.feed_service import FeedError, get_feed
+from services.scrape_service import get_scraped_article
+from services.summary_service import generate_summary, stream_summary
+from services.user_service import get_saved_article_urls, remove_saved_article
+from utils.scraper import ScrapeError, ScrapeTimeout
 
 router = APIRouter(
     prefix="/articles",
@@ -21,88 +41,92 @@ router = APIRouter(
 )
 
 
-ARTICLE_CACHE = {}
-
-
-@router.get("/detail")
+@router.get("/detail", response_model=ArticleDetailResponse)
 async def get_article_detail(
         article_url: str,
         source: str | None = None
     ):
 
-    if article_url in ARTICLE_CACHE:
-        return ARTICLE_CACHE[article_url]
-
     try:
-        article = NewsArticle(article_url)
-        article.download()
-        article.parse()
-    except Exception as e:
+        article = await get_scraped_article(article_url)
+    except ScrapeTimeout as e:
+        print("Scraping timeout", e)
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Timed out scraping article")
+    except ScrapeError as e:
         print("Scraping error", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to scrape article")
 
-    result = {
-        "title": article.title,
-        "text": article.text,
-        "image": article.top_image,
+    return {
+        "title": article["title"],
+        "text": article["text"],
+        "image": article["image"],
         "source": source,
-        "authors": article.authors,
-        "published_date": str(article.publish_date)
+        "authors": article["authors"],
+        "published_date": article["published_date"]
     }
 
-    ARTICLE_CACHE[article_url] = result
-    print(ARTICLE_CACHE)
-    return result
-
-
-@router.get("/saved-articles")
-async def get_saved_articles(current_user=Depends(get_current_user)):
-
-    user = await User.get(current_user.id)
 
-    print(user.saved_articles)
-
-    if not user:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="User not found")
-
-    articles = await Article.find(
-        In(Article.article_url, user.saved_articles)
-    ).to_list()
+@router.get("/saved-articles", response_model=SavedArticlesPage, response_model_exclude_unset=True)
+async def get_saved_articles(
+        limit: int = Query(default=20, ge=1, le=100),
+        cursor: str | None = None,
+        fields: str | None = None,
+        current_user=Depends(get_current_user)
+    ):
 
-    print(len(articles))
+    try:
+        return await list_saved_articles(current_user.id, cursor, limit, parse_fields(fields))
+    except InvalidListingQuery as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/search", response_model=SearchResults)
+async def search(
+        q: str = Query(min_length=1, max_length=200),
+        source: str | None = None,
+        bias: str | None = None,
+        # articles have no publish date, the range applies to when they were first stored
+        date_from: datetime | None = Query(default=None, description="Stored on or after (insert time)"),
+        date_to: datetime | None = Query(default=None, description="Stored on or before (insert time)"),
+        limit: int = Query(default=20, ge=1, le=100),
+        cursor: str | None = None
+    ):
 
-    return articles
+    try:
+        return await search_articles(q, source, bias, date_from, date_to, cursor, limit)
+    except InvalidListingQuery as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/saved-articles-ids")
+@router.get("/saved-articles-ids", response_model=List[str])
 async def saved_articles_ids(current_user=Depends(get_current_user)):
 
-    user = await User.get(current_user.id)
-
-    if not user:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="User not found")
+    return await get_saved_article_urls(current_user.id)
 
-    article_urls = user.saved_articles
 
-    return [ article_url for article_url in article_urls ]
+async def _save_summary(user_id, body: SaveArticleRequest, result: dict) -> dict:
+    summary = result.get("summary", [])
+    bias = result.get("bias", "Unknown")
 
+    if result.get("fallback"):
+        # the local fallback is returned but not stored, the next request for this article tries the llm again
+        await save_article_for_user(user_id, body)
+        return {"title": body.title, "image": body.image_url, "summary": summary, "bias": bias}
 
-@router.post("/summarize")
-async def summarize(body: SaveArticleRequest, current_user=Depends(get_current_user)):
+    return await save_article_for_user(user_id, body, summary, bias)
 
-    user = await User.get(current_user.id)
 
-    if not user:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="User not found")
+@router.post("/summarize", response_model=SummaryResponse, response_model_exclude_none=True)
+async def summarize(body: SaveArticleRequest, current_user=Depends(get_current_user)):
 
     description = body.description
 
     if not description:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Article description required")
 
-    article = await Article.find_one(Article.article_url == body.article_url)
+    article = await find_summarized_article(body.article_url)
 
-    if article and article.summary and article.bias:
+    if article and article.article_url == body.article_url:
         return {
             "title": article.title,
             "image": article.image_url,
@@ -110,28 +134,145 @@ async def summarize(body: SaveArticleRequest, current_user=Depends(get_current_u
             "bias": article.bias
         }
 
-    result = await summarize_article(body.description)
+    if article:
+        # another outlet's copy of this story is already summarized
+        result = {"summary": article.summary, "bias": article.bias}
+    else:
+        result = await generate_summary(body.article_url, description)
 
-    if not result:
-        raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail="AI summarization failed")
+        if not result:
+            raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail="AI summarization failed")
+
+    return await _save_summary(current_user.id, body, result)
 
-    summary = result.get("summary", [])
-    bias = result.get("bias", "Unknown")
 
-    result = await save_article_for_user(user, body, summary, bias)
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/summarize-stream")
+async def summarize_stream(body: SaveArticleRequest, current_user=Depends(get_current_user)):
+
+    if not body.description:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Article description required")
 
-    return result
+    article = await find_summarized_article(body.article_url)
+
+    async def events():
+        # a stored summary is replayed with the same events, so the client has one code path
+        if article:
+            for index, bullet in enumerate(article.summary):
+                yield _sse("bullet", {"index": index, "text": bullet})
+            yield _sse("bias", {"bias": article.bias})
+
+            if article.article_url == body.article_url:
+                yield _sse("done", {
+                    "title": article.title,
+                    "image": article.image_url,
+                    "summary": article.summary,
+                    "bias": article.bias
+                })
+            else:
+                # summary of another copy of the same story, stored for this url as well
+                yield _sse("done", await save_article_for_user(current_user.id, body, article.summary, article.bias))
+            return
+
+        sent = 0
+        result = None
+
+        try:
+            async for event, value in stream_summary(body.article_url, body.description):
+                if event == "bullet":
+                    yield _sse("bullet", {"index": sent, "text": value})
+                    sent += 1
+                else:
+                    result = value
+        except OpenAIError as e:
+            print("OpenAI error", e)
+            yield _sse("error", {"detail": "AI summarization failed"})
+            return
+
+        summary = result.get("summary", [])
+        bias = result.get("bias", "Unknown")
+
+        # anything the incremental parser could not pick up is sent from the final parse
+        for index in range(sent, len(summary)):
+            yield _sse("bullet", {"index": index, "text": summary[index]})
+        yield _sse("bias", {"bias": bias})
+
+        yield _sse("done", await _save_summary(current_user.id, body, result))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/summarize-batch")
+async def summarize_batch(body: List[SaveArticleRequest], current_user=Depends(get_current_user)):
+
+    if len(body) > settings.SUMMARIZE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.SUMMARIZE_BATCH_MAX_ITEMS} articles per batch"
+        )
+
+    # one query resolves every article that already has a summary, directly or through its story
+    existing = await find_summarized_articles({item.article_url for item in body})
+
+    limit = asyncio.Semaphore(settings.SUMMARIZE_BATCH_CONCURRENCY)
+
+    async def resolve(item: SaveArticleRequest):
+        article = existing.get(item.article_url)
+
+        if article and article.article_url == item.article_url:
+            return {
+                "article_url": item.article_url,
+                "title": article.title,
+                "image": article.image_url,
+                "summary": article.summary,
+                "bias": article.bias
+            }
+
+        if not item.description:
+            return {"article_url": item.article_url, "error": "Article description required"}
+
+        try:
+            if article:
+                result = {"summary": article.summary, "bias": article.bias}
+            else:
+                async with limit:
+                    result = await generate_summary(item.article_url, item.description)
+
+            if not result:
+                return {"article_url": item.article_url, "error": "AI summarization failed"}
+
+            saved = await _save_summary(current_user.id, item, result)
+        except Exception as e:
+            print("Batch summarization error", e)
+            return {"article_url": item.article_url, "error": "AI summarization failed"}
+
+        return {"article_url": item.article_url, **saved}
+
+    # misses run concurrently, results are written back as ndjson in input order
+    tasks = [asyncio.create_task(resolve(item)) for item in body]
+
+    async def stream():
+        try:
+            for task in tasks:
+                yield json.dumps(await task) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @router.post("/save-article")
 async def save_article(body: SaveArticleRequest, current_user=Depends(get_current_user)):
-    
-    user = await User.get(current_user.id)
-
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    await save_article_for_user(user, body)
+    await save_article_for_user(current_user.id, body)
     return {
         "message": "Article saved successfully"
     }
@@ -140,51 +281,18 @@ async def save_article(body: SaveArticleRequest, current_user=Depends(get_curren
 @router.delete("/remove-article")
 async def remove_article(article_url: str, current_user=Depends(get_current_user)):
     
-    user = await User.get(current_user.id)
-
-    if article_url in user.saved_articles:
-        user.saved_articles.remove(article_url)
-        await user.save()
+    await remove_saved_article(current_user.id, article_url)
 
     return {"message": "Article removed"}
 
 
-@router.get("/{query}")
+@router.get("/{query}", response_model=List[FeedArticle])
 async def get_articles(
-        # category: str
+        request: Request,
         query: str
 ):
-    # url = "https://newsapi.org/v2/top-headlines"
-    url = "https://newsdata.io/api/1/latest"
-
-    params = {
-        # "apiKey": settings.NEWSAPI_API_KEY,
-        "apikey": settings.NEWSAPI_API_KEY,
-        # "category": category,
-        "q": query,
-        "language": "en"
-    }
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-
-    if response.status_code != 200:
+    try:
+        return await get_feed(request.app.state.http_client, query)
+    except FeedError as e:
+        print("Feed error", e)
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to fetch news articles")
-
-    data = response.json()
-    # articles = data.get("articles", [])
-    articles = data.get("results", [])
-
-    return [
-        {
-            "title": article["title"],
-            "description": article["description"],
-            # "image_url": article["urlToImage"],
-            "image_url": article["image_url"],
-            "source": article["source_name"],
-            # "article_url": article["url"],
-            "article_url": article["link"],
-            "summary": "TODO"
-        }
-        for article in articles
-    ]
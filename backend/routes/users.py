@@ -6,6 +6,7 @@ from typing import Optional
 from jose import ExpiredSignatureError
 from models.user import User
 from beanie import PydanticObjectId
+from beanie.operators import Set
 from beanie.odm.operators.find.logical import Or
 
 from schemas.users import (
@@ -13,11 +14,19 @@ from schemas.users import (
     UserLoginRequest,
     UserResponse,
     TokenResponse,
-    TokenRefreshRequest
+    TokenRefreshRequest,
+    CurrentUser
 )
 
 from core.config import settings
-from utils.auth import create_access_token, create_refresh_token, decode_token, verify_password, hash_password
+from services.user_service import get_user_profile, remove_all_saved_articles
+from utils.auth import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    hash_password_async,
+    verify_and_update_password_async
+)
 
 router = APIRouter(
     prefix="/users",
@@ -25,6 +34,13 @@ router = APIRouter(
 )
 
 
+def _identity_claims(user_doc: User) -> dict:
+    return {
+        "username": user_doc.username,
+        "email": user_doc.email
+    }
+
+
 def _user_dict_to_response(user_doc: User) -> UserResponse:
     return UserResponse(
         id=str(user_doc.id),
@@ -54,7 +70,7 @@ async def register_user(
         last_name=body.last_name,
         username=body.username,
         email=body.email,
-        hashed_password=hash_password(body.password),
+        hashed_password=await hash_password_async(body.password),
         refresh_token=None
     )
 
@@ -83,13 +99,19 @@ async def login_user(
             detail="Invalid credentials"
         )
 
-    if not verify_password(body.password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password_async(body.password, user.hashed_password)
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    access_token = create_access_token(subject=str(user.id))
+    # argon2 parameters changed since this hash was made, store the upgraded hash
+    if new_hash:
+        user.hashed_password = new_hash
+
+    access_token = create_access_token(subject=str(user.id), claims=_identity_claims(user))
     refresh_token = create_refresh_token(subject=str(user.id))
 
     # save the refresh token in the db, and give both access and refresh tokens to the user, usually in cookies
@@ -128,11 +150,10 @@ async def logout_user(
     request: Request,
     response: Response
 ):
-    user = await get_current_user(request)
+    current_user = await get_current_user(request)
 
     # clear the refresh_token from the database.
-    user.refresh_token = None
-    await user.save()
+    await User.find_one(User.id == current_user.id).update(Set({User.refresh_token: None}))
 
     cookie_options = {
         "path": "/",
@@ -209,7 +230,7 @@ async def refresh_token(
 
 
     # issue new access and refresh tokens
-    new_access = create_access_token(subject=str(user_id))
+    new_access = create_access_token(subject=str(user_id), claims=_identity_claims(user_doc))
     new_refresh = create_refresh_token(subject=str(user_id))
 
     user_doc.refresh_token = new_refresh
@@ -271,25 +292,35 @@ async def get_current_user(
             detail="Invalid user id"
         )
 
-    user_doc = await User.get(uid)
-
-    if not user_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-
-    return user_doc
+    return CurrentUser(
+        id=uid,
+        username=payload.get("username"),
+        email=payload.get("email")
+    )
 
 
 @router.get("/me")
 async def read_me(
     current_user=Depends(get_current_user)
 ):
+    username = current_user.username
+    email = current_user.email
+
+    # tokens issued before identity claims were added still need a lookup
+    if not username or not email:
+        profile = await get_user_profile(current_user.id)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        username = profile["username"]
+        email = profile["email"]
+
     return {
         "id": str(current_user.id),
-        "username": current_user.username,
-        "email": current_user.email
+        "username": username,
+        "email": email
     }
 
 
@@ -313,5 +344,6 @@ async def delete_user(
         )
 
     await user_doc.delete()
+    await remove_all_saved_articles(uid)
     
     return {"message": "User deleted"}
@@ -1,10 +1,12 @@
+from datetime import datetime
 from pydantic import BaseModel
+from typing import List, Optional
 
 class SaveArticleRequest(BaseModel):
-    title: str
+    title: Optional[str] = None
     description: str
     image_url: str
-    source: str
+    source: Optional[str] = None
     article_url: str
 
 class SummaryRequest(BaseModel):
@@ -12,3 +14,64 @@ class SummaryRequest(BaseModel):
     description: str
     image_url: str
     article_url: str
+
+class DuplicateSource(BaseModel):
+    source: Optional[str] = None
+    article_url: str
+
+# newsdata sends null for any field it could not extract, only the link is always there
+class FeedArticle(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    source: Optional[str] = None
+    article_url: str
+    duplicates: List[DuplicateSource] = []
+
+# response models, declaring them lets fastapi serialize straight to json bytes in pydantic's rust core
+
+class ArticleDetailResponse(BaseModel):
+    title: Optional[str] = None
+    text: Optional[str] = None
+    image: Optional[str] = None
+    source: Optional[str] = None
+    authors: List[str] = []
+    published_date: Optional[str] = None
+
+class SummaryResponse(BaseModel):
+    title: Optional[str] = None
+    image: Optional[str] = None
+    summary: Optional[List[str]] = None
+    bias: Optional[str] = None
+    message: Optional[str] = None
+
+class SavedArticleItem(BaseModel):
+    # everything but article_url is optional, a fields= projection only fills what was asked for
+    article_url: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    source: Optional[str] = None
+    summary: Optional[List[str]] = None
+    bias: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class SavedArticlesPage(BaseModel):
+    items: List[SavedArticleItem]
+    next_cursor: Optional[str] = None
+    total: int
+
+class SearchHit(BaseModel):
+    article_url: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    source: Optional[str] = None
+    summary: Optional[List[str]] = None
+    bias: Optional[str] = None
+    created_at: Optional[datetime] = None
+    score: float
+
+class SearchResults(BaseModel):
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
@@ -1,3 +1,4 @@
+from beanie import PydanticObjectId
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 
@@ -30,3 +31,10 @@ class TokenResponse(BaseModel):
 
 class TokenRefreshRequest(BaseModel):
     refresh_token: str
+
+
+class CurrentUser(BaseModel):
+    # request scoped identity built from the access token claims, no database read involved
+    id: PydanticObjectId
+    username: Optional[str] = None
+    email: Optional[str] = None
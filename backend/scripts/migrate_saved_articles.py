@@ -0,0 +1,63 @@
+# Moves the embedded User.saved_articles lists into the saved_articles collection.
+#
+# Safe to re-run: entries are upserted on (user_id, article_url) and a user's list is only
+# unset once all of its entries are written. The old lists have no save times, so saved_at is
+# taken from when each article was first stored, which keeps migrated saves older than any
+# made since the deploy. Run from the backend directory:
+#
+#   python -m scripts.migrate_saved_articles
+import asyncio
+from datetime import timedelta
+from fastapi import FastAPI
+from pymongo import UpdateOne
+from db.connect_db import startup_db_client, shutdown_db_client
+from models.article import Article
+from models.saved_article import SavedArticle
+from models.user import User
+
+
+async def migrate():
+    app = FastAPI()  # only used to hold the connection on app.state
+    await startup_db_client(app)
+
+    users = User.get_pymongo_collection()
+    saved = SavedArticle.get_pymongo_collection()
+    articles = Article.get_pymongo_collection()
+    migrated_users = 0
+    migrated_articles = 0
+
+    try:
+        async for doc in users.find({"saved_articles.0": {"$exists": True}}, {"saved_articles": 1, "created_at": 1}):
+            urls = list(dict.fromkeys(doc["saved_articles"]))
+
+            created = {
+                article["article_url"]: article["created_at"]
+                async for article in articles.find({"article_url": {"$in": urls}}, {"article_url": 1, "created_at": 1})
+                if article.get("created_at")
+            }
+
+            # an article is saved no earlier than it was stored, and no earlier than the user signed up.
+            # the old list was in save order, so times never go backwards along it
+            saved_at = doc.get("created_at") or doc["_id"].generation_time.replace(tzinfo=None)
+            operations = []
+            for url in urls:
+                saved_at = max(created.get(url, saved_at), saved_at + timedelta(milliseconds=1))
+                operations.append(UpdateOne(
+                    {"user_id": doc["_id"], "article_url": url},
+                    {"$setOnInsert": {"saved_at": saved_at}},
+                    upsert=True
+                ))
+
+            await saved.bulk_write(operations, ordered=False)
+            await users.update_one({"_id": doc["_id"]}, {"$unset": {"saved_articles": ""}})
+
+            migrated_users += 1
+            migrated_articles += len(urls)
+    finally:
+        await shutdown_db_client(app)
+
+    print(f"Migrated {migrated_articles} saved articles for {migrated_users} users")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,74 @@
+import os
+import signal
+import subprocess
+import sys
+import uvicorn
+from core.config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def share_llm_limits(processes: int):
+    # every process has its own rate governor, so each gets an equal share of the account's limits
+    if processes <= 1:
+        return
+
+    for name in ("OPENAI_RPM_LIMIT", "OPENAI_TPM_LIMIT"):
+        total = getattr(settings, name)
+        if total > 0:
+            os.environ[name] = str(max(1, total // processes))
+
+
+def start_prefetch(workers: int):
+    # every worker would otherwise run its own scheduler, repeating each feed, scrape and llm call
+    # (and its hourly llm budget) once per worker, so the scheduler runs once in its own process
+    if workers <= 1 or not settings.PREFETCH_ENABLED:
+        return None
+
+    # workers are separate processes that read their settings from the environment again
+    os.environ["PREFETCH_ENABLED"] = "false"
+    return subprocess.Popen([sys.executable, "prefetch_worker.py"], cwd=BACKEND_DIR)
+
+
+def stop_prefetch(process):
+    if process is None or process.poll() is not None:
+        return
+
+    # SIGINT cancels the scheduler so prefetch_worker closes its connections
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=settings.SHUTDOWN_DRAIN_SECONDS)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# production entry point, every option comes from Settings (or the environment / .env)
+def main():
+    workers = settings.SERVER_WORKERS or os.cpu_count() or 1
+
+    # set before anything is started, the workers and the prefetch process read them from the environment
+    share_llm_limits(workers + (1 if workers > 1 and settings.PREFETCH_ENABLED else 0))
+    prefetch = start_prefetch(workers)
+
+    try:
+        uvicorn.run(
+            "main:app",
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            workers=workers,
+            loop=settings.SERVER_LOOP,
+            http=settings.SERVER_HTTP,
+            backlog=settings.SERVER_BACKLOG,
+            timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+            limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY or None,
+            timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+            proxy_headers=settings.SERVER_PROXY_HEADERS,
+            forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+            access_log=settings.SERVER_ACCESS_LOG
+        )
+    finally:
+        stop_prefetch(prefetch)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,236 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
 from models.article import Article
+from models.saved_article import SavedArticle
+from services.story_service import canonical_url
+from services.user_service import add_saved_article
+from utils.pagination import decode_cursor, encode_cursor
 
-async def save_article_for_user(user, body, summary=None, bias=None):
-
-    article = await Article.find_one(Article.article_url == body.article_url)
-
-    # if article already exists
-    if article:
-        if article.article_url in user.saved_articles and not summary and not bias:
-            return {"message": "Article already saved"}
-
-        if summary:
-            article.summary = summary
-        if bias:
-            article.bias = bias
-        await article.save()
-    else:
-        article = Article(
-            title=body.title,
-            description=body.description,
-            image_url=body.image_url,
-            source=body.source,
-            article_url=body.article_url,
-            summary=summary,
-            bias=bias
-        )
-        await article.insert()
-
-    # save reference in user
-    if article.article_url not in user.saved_articles:
-        user.saved_articles.append(article.article_url)
-        await user.save()
+# fields a client may ask for in the saved articles listing, article_url is always returned
+PROJECTABLE_FIELDS = {"title", "description", "image_url", "source", "summary", "bias", "created_at"}
+
+SEARCH_FIELDS = ("title", "description", "image_url", "source", "article_url", "summary", "bias", "created_at")
+
+
+class InvalidListingQuery(Exception):
+    pass
+
+
+def _article_upsert(body, summary=None, bias=None) -> dict:
+    # identity fields are only written when the document is created, summary and bias are partial $sets
+    changes = {}
+    if summary:
+        changes["summary"] = summary
+    if bias:
+        changes["bias"] = bias
+
+    on_insert = {
+        "title": body.title,
+        "description": body.description,
+        "image_url": body.image_url,
+        "source": body.source,
+        "article_url": body.article_url,
+        "created_at": datetime.utcnow()
+    }
+    on_insert.update({field: None for field in ("summary", "bias") if field not in changes})
+
+    update = {"$setOnInsert": on_insert}
+    if changes:
+        update["$set"] = changes
+
+    return update
+
+
+async def upsert_article(body, summary=None, bias=None) -> dict:
+
+    collection = Article.get_pymongo_collection()
+
+    # a duplicate key means a concurrent upsert inserted first, the retry then matches its document
+    for attempt in range(2):
+        try:
+            return await collection.find_one_and_update(
+                {"article_url": body.article_url},
+                _article_upsert(body, summary, bias),
+                projection={"_id": 0, "title": 1, "image_url": 1, "summary": 1, "bias": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            if attempt:
+                raise
+
+
+async def bulk_upsert_articles(entries) -> None:
+    # entries are (body, summary, bias) tuples, written in a single round trip
+    if not entries:
+        return
+
+    await Article.get_pymongo_collection().bulk_write(
+        [
+            UpdateOne(
+                {"article_url": body.article_url},
+                _article_upsert(body, summary, bias),
+                upsert=True
+            )
+            for body, summary, bias in entries
+        ],
+        ordered=False
+    )
+
+
+async def find_summarized_articles(article_urls) -> dict:
+    # url -> stored article with a summary, falling back to the canonical copy of a syndicated story
+    canonicals = {url: canonical_url(url) for url in article_urls}
+    articles = await Article.find(
+        In(Article.article_url, list(set(canonicals) | set(canonicals.values())))
+    ).to_list()
+    summarized = {article.article_url: article for article in articles if article.summary and article.bias}
+
+    found = {}
+    for url, canonical in canonicals.items():
+        article = summarized.get(url) or summarized.get(canonical)
+        if article:
+            found[url] = article
+
+    return found
+
+
+async def find_summarized_article(article_url: str) -> Optional[Article]:
+    return (await find_summarized_articles([article_url])).get(article_url)
+
+
+async def save_article_for_user(user_id, body, summary=None, bias=None):
+
+    article = await upsert_article(body, summary, bias)
+
+    # the upsert itself tells whether the user had saved it already, no saved list is loaded first
+    saved = await add_saved_article(user_id, body.article_url)
+
+    if not saved and not summary and not bias:
+        return {"message": "Article already saved"}
+
+    return {
+        "title": article["title"],
+        "image": article["image_url"],
+        "summary": article["summary"],
+        "bias": article["bias"]
+    }
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - PROJECTABLE_FIELDS - {"article_url"}
+    if unknown:
+        raise InvalidListingQuery(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    return tuple(sorted(requested - {"article_url"}))
+
+
+async def list_saved_articles(user_id: PydanticObjectId, cursor: Optional[str], limit: int, fields: Optional[Tuple[str, ...]]):
+
+    query = {"user_id": user_id}
+
+    # keyset pagination on (saved_at, _id), so deep pages cost the same as the first one
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            saved_at = datetime.fromisoformat(position["saved_at"])
+            last_id = PydanticObjectId(position["id"])
+        except Exception:
+            raise InvalidListingQuery("Invalid cursor")
+
+        query["$or"] = [
+            {"saved_at": {"$gt": saved_at}},
+            {"saved_at": saved_at, "_id": {"$gt": last_id}}
+        ]
+
+    entries = await SavedArticle.find(query).sort(
+        +SavedArticle.saved_at, +SavedArticle.id
+    ).limit(limit + 1).to_list()
+
+    total = await SavedArticle.find(SavedArticle.user_id == user_id).count()
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    page = [entry.article_url for entry in entries]
+
+    # plain dicts straight from the driver, the route's response model does the only validation pass
+    projection = {"_id": 0}
+    if fields is not None:
+        projection.update({field: 1 for field in ("article_url", *fields)})
+    found = await Article.get_pymongo_collection().find({"article_url": {"$in": page}}, projection).to_list(length=None)
+    articles = {article["article_url"]: article for article in found}
+
+    next_cursor = None
+    if has_more:
+        last = entries[-1]
+        next_cursor = encode_cursor({"saved_at": last.saved_at.isoformat(), "id": str(last.id)})
+
+    return {
+        # keep save order, skipping urls whose article document is gone
+        "items": [articles[url] for url in page if url in articles],
+        "next_cursor": next_cursor,
+        "total": total
+    }
+
+
+async def search_articles(
+        text: str,
+        source: Optional[str],
+        bias: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        cursor: Optional[str],
+        limit: int
+    ):
+
+    query = {"$text": {"$search": text}}
+    if source:
+        query["source"] = source
+    if bias:
+        query["bias"] = bias
+    # created_at is when the article was first stored, the feed's publish date is not kept
+    if date_from or date_to:
+        query["created_at"] = {}
+        if date_from:
+            query["created_at"]["$gte"] = date_from
+        if date_to:
+            query["created_at"]["$lte"] = date_to
+
+    # text score cannot be used in a range filter, so pages are an offset wrapped in the usual cursor
+    offset = 0
+    if cursor:
+        try:
+            offset = decode_cursor(cursor)["offset"]
+        except Exception:
+            raise InvalidListingQuery("Invalid cursor")
+
+        # only cursors this endpoint issued are accepted, a negative skip makes the query itself fail
+        if type(offset) is not int or offset < 0:
+            raise InvalidListingQuery("Invalid cursor")
+
+    if offset + limit > settings.SEARCH_MAX_RESULTS:
+        raise InvalidListingQuery(f"Search results are limited to the first {settings.SEARCH_MAX_RESULTS}")
+
+    projection = {"_id": 0, "score": {"$meta": "textScore"}, **{field: 1 for field in SEARCH_FIELDS}}
+
+    found = await Article.get_pymongo_collection().find(query, projection).sort(
+        [("score", {"$meta": "textScore"}), ("created_at", DESCENDING)]
+    ).skip(offset).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(found) > limit and offset + limit < settings.SEARCH_MAX_RESULTS:
+        next_cursor = encode_cursor({"offset": offset + limit})
 
     return {
-        "title": article.title,
-        "image": article.image_url,
-        "summary": article.summary,
-        "bias": article.bias
+        "items": found[:limit],
+        "next_cursor": next_cursor
     }
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import httpx
+from core.config import settings
+from services.story_service import collapse_duplicates, remember_stories
+from utils.metrics import timed
+from utils.cache import create_cache
+from utils.single_flight import SingleFlight
+
+# entries are kept for the fresh ttl plus the stale window, and served stale while a refresh runs
+FEED_CACHE = create_cache(
+    "feeds",
+    max_bytes=settings.FEED_CACHE_MAX_BYTES,
+    ttl=settings.FEED_CACHE_TTL_SECONDS + settings.FEED_CACHE_STALE_SECONDS
+)
+
+FEED_FLIGHTS = SingleFlight()
+
+# keep references to background refreshes so they are not garbage collected mid-flight
+_refresh_tasks = set()
+
+
+class FeedError(Exception):
+    pass
+
+
+async def _fetch_feed(client: httpx.AsyncClient, query: str) -> list:
+    params = {
+        "apikey": settings.NEWSAPI_API_KEY,
+        "q": query,
+        "language": "en"
+    }
+
+    try:
+        with timed("newsdata"):
+            response = await client.get(settings.NEWSDATA_API_URL, params=params)
+    except httpx.HTTPError as e:
+        raise FeedError(str(e)) from e
+
+    if response.status_code != 200:
+        raise FeedError(f"newsdata returned {response.status_code}")
+
+    data = response.json()
+    articles = data.get("results", [])
+
+    return collapse_duplicates([
+        {
+            "title": article.get("title"),
+            "description": article.get("description"),
+            "image_url": article.get("image_url"),
+            "source": article.get("source_name"),
+            "article_url": article["link"]
+        }
+        for article in articles
+    ])
+
+
+async def _fetch_and_cache(client: httpx.AsyncClient, key: str, query: str) -> list:
+    articles = await _fetch_feed(client, query)
+    # wall clock, the entry may be read by another process
+    await FEED_CACHE.set(key, [time.time(), articles])
+    return articles
+
+
+def _refresh_in_background(client: httpx.AsyncClient, key: str, query: str):
+    if key in FEED_FLIGHTS:
+        return
+
+    task = asyncio.create_task(FEED_FLIGHTS.do(key, lambda: _fetch_and_cache(client, key, query)))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_on_refresh_done)
+
+
+def _on_refresh_done(task: asyncio.Task):
+    _refresh_tasks.discard(task)
+
+    if not task.cancelled() and task.exception():
+        print("Feed refresh error", task.exception())
+
+
+async def get_feed(client: httpx.AsyncClient, query: str) -> list:
+    key = query.strip().lower()
+    cached = await FEED_CACHE.get(key)
+
+    if cached is not None:
+        fetched_at, articles = cached
+
+        # with a shared cache the feed may have been collapsed by another worker, whose story index this one lacks
+        if FEED_CACHE.backend != "memory":
+            remember_stories(articles)
+
+        # stale entries are still served, the refresh happens off the request path
+        if time.time() - fetched_at >= settings.FEED_CACHE_TTL_SECONDS:
+            _refresh_in_background(client, key, query)
+
+        return articles
+
+    return await FEED_FLIGHTS.do(key, lambda: _fetch_and_cache(client, key, query))
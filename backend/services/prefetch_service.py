@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+import httpx
+from beanie.operators import In
+from core.config import settings
+from models.article import Article
+from schemas.articles import FeedArticle
+from services.article_service import bulk_upsert_articles
+from services.feed_service import FeedError, get_feed
+from services.scrape_service import get_scraped_article
+from services.summary_service import find_ready_summary, generate_summary
+from utils.llm_governor import background_priority
+from utils.scraper import ScrapeError
+from utils.summarizer import estimate_llm_calls
+
+
+class HourlyBudget:
+    def __init__(self, max_calls: int):
+        self.max_calls = max_calls
+        self._calls = deque()
+
+    def remaining(self) -> int:
+        cutoff = time.monotonic() - 3600
+        while self._calls and self._calls[0] < cutoff:
+            self._calls.popleft()
+        return self.max_calls - len(self._calls)
+
+    def try_acquire(self, calls: int = 1) -> bool:
+        if calls > self.remaining():
+            return False
+        now = time.monotonic()
+        self._calls.extend([now] * calls)
+        return True
+
+
+class PrefetchScheduler:
+    def __init__(self, http_client: httpx.AsyncClient):
+        self.http_client = http_client
+        self.categories = [c.strip() for c in settings.PREFETCH_CATEGORIES.split(",") if c.strip()]
+        self.llm_budget = HourlyBudget(settings.PREFETCH_MAX_LLM_CALLS_PER_HOUR)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print("Prefetch error", e)
+
+            await asyncio.sleep(settings.PREFETCH_INTERVAL_SECONDS)
+
+    async def run_once(self):
+        for category in self.categories:
+            try:
+                feed = await get_feed(self.http_client, category)
+            except FeedError as e:
+                print("Prefetch feed error", category, e)
+                continue
+
+            candidates = [FeedArticle(**item) for item in feed[:settings.PREFETCH_TOP_N]]
+
+            # skip stories that already have a stored summary
+            done = await Article.find(
+                In(Article.article_url, [item.article_url for item in candidates]),
+                Article.bias != None
+            ).to_list()
+            done = {article.article_url for article in done}
+
+            summarized = []
+            for item in candidates:
+                if item.article_url not in done:
+                    result = await self._warm(item)
+                    # a fallback summary is left out, the story is tried again on the next round
+                    if result and not result.get("fallback"):
+                        summarized.append((item, result.get("summary", []), result.get("bias", "Unknown")))
+
+            await bulk_upsert_articles(summarized)
+
+    async def _warm(self, item: FeedArticle):
+        try:
+            scraped = await get_scraped_article(item.article_url)
+            text = scraped["text"] or item.description
+        except ScrapeError:
+            text = item.description
+
+        if not text:
+            return None
+
+        # syndicated copies and local summaries cost nothing, so they do not use up the budget
+        ready = await find_ready_summary(item.article_url, text)
+        if ready:
+            return ready
+
+        # scraping is cheap, llm calls are capped per hour, a long article is charged for every chunk
+        if not self.llm_budget.try_acquire(estimate_llm_calls(text)):
+            return None
+
+        # queued behind summaries users are waiting for
+        with background_priority():
+            return await generate_summary(item.article_url, text)
@@ -0,0 +1,158 @@
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
+from models.scraped_content import ScrapedContent
+from services.story_service import canonical_url
+from utils.cache import NegativeEntry, create_cache
+from utils.scraper import ScrapeError, ScrapeGone, ScrapeTimeout, scrape_article
+from utils.single_flight import SingleFlight
+from utils.urls import normalize_url
+
+ARTICLE_CACHE = create_cache(
+    "articles",
+    max_bytes=settings.ARTICLE_CACHE_MAX_BYTES,
+    ttl=settings.ARTICLE_CACHE_TTL_SECONDS,
+    negative_ttl=settings.ARTICLE_CACHE_NEGATIVE_TTL_SECONDS
+)
+
+SCRAPE_FLIGHTS = SingleFlight()
+
+
+def _from_stored(stored: ScrapedContent) -> dict:
+    return {
+        "title": stored.title,
+        "text": zlib.decompress(stored.body).decode("utf-8") if stored.body else "",
+        "image": stored.image,
+        "authors": stored.authors,
+        "published_date": stored.published_date
+    }
+
+
+async def _load_stored(key: str) -> Optional[ScrapedContent]:
+    if not settings.SCRAPED_CONTENT_ENABLED:
+        return None
+    return await ScrapedContent.find_one(ScrapedContent.key == key)
+
+
+async def _store(key: str, article_url: str, scraped: dict):
+    if not settings.SCRAPED_CONTENT_ENABLED:
+        return
+
+    body = zlib.compress((scraped["text"] or "").encode("utf-8"), settings.SCRAPED_CONTENT_COMPRESSION_LEVEL)
+    try:
+        await ScrapedContent.get_pymongo_collection().update_one(
+            {"key": key},
+            {"$set": {
+                "article_url": article_url,
+                "title": scraped["title"],
+                "body": body,
+                "image": scraped["image"],
+                "authors": scraped["authors"],
+                "published_date": scraped["published_date"],
+                "etag": scraped.get("etag"),
+                "last_modified": scraped.get("last_modified"),
+                "fetched_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # another worker stored the same story at the same moment
+        pass
+
+
+async def _confirm_stored(key: str):
+    # a 304 means the stored copy is current, which also restarts its ttl
+    await ScrapedContent.get_pymongo_collection().update_one(
+        {"key": key},
+        {"$set": {"fetched_at": datetime.utcnow()}}
+    )
+
+
+async def _delete_stored(key: str):
+    if settings.SCRAPED_CONTENT_ENABLED:
+        await ScrapedContent.get_pymongo_collection().delete_one({"key": key})
+
+
+async def _scrape_and_cache(key: str, article_url: str) -> dict:
+    stored = await _load_stored(key)
+
+    # content confirmed recently is served from mongo, so a restarted api does not hit publishers again
+    if stored is not None and datetime.utcnow() - stored.fetched_at < timedelta(seconds=settings.SCRAPED_CONTENT_FRESH_SECONDS):
+        article = _from_stored(stored)
+        await ARTICLE_CACHE.set(key, article)
+        return article
+
+    try:
+        scraped = await scrape_article(
+            article_url,
+            etag=stored.etag if stored else None,
+            last_modified=stored.last_modified if stored else None
+        )
+    except ScrapeTimeout:
+        # slow sites are not negatively cached, the next request may well succeed
+        if stored is None:
+            raise
+        scraped = None
+    except ScrapeGone:
+        # the publisher took the article down, a stored copy must not keep serving it
+        if stored is not None:
+            await _delete_stored(key)
+        await ARTICLE_CACHE.set_negative(key, "Article no longer available")
+        raise
+    except ScrapeError:
+        if stored is None:
+            await ARTICLE_CACHE.set_negative(key, "Failed to scrape article")
+            raise
+        scraped = None
+
+    if scraped is None:
+        # the publisher is down or slow, the older copy is better than an error and is
+        # only cached briefly so the publisher is tried again soon
+        article = _from_stored(stored)
+        await ARTICLE_CACHE.set(key, article, ttl=settings.ARTICLE_CACHE_NEGATIVE_TTL_SECONDS)
+        return article
+
+    if scraped.get("not_modified"):
+        await _confirm_stored(key)
+        article = _from_stored(stored)
+    else:
+        await _store(key, article_url, scraped)
+        article = {field: scraped[field] for field in ("title", "text", "image", "authors", "published_date")}
+
+    await ARTICLE_CACHE.set(key, article)
+    return article
+
+
+async def get_scraped_article(article_url: str) -> dict:
+    # copies of a syndicated story share one cache entry, whichever copy is requested first gets scraped
+    key = normalize_url(canonical_url(article_url))
+    cached = await ARTICLE_CACHE.get(key)
+
+    # urls that recently failed to scrape are not retried until the negative entry expires
+    if isinstance(cached, NegativeEntry):
+        raise ScrapeError(cached.detail)
+
+    if cached is not None:
+        return cached
+
+    # concurrent requests for the same story share a single scrape
+    return await SCRAPE_FLIGHTS.do(key, lambda: _scrape_and_cache(key, article_url))
+
+
+async def get_cached_article_text(article_url: str):
+    # full text from an earlier /detail scrape, without triggering a new one
+    key = normalize_url(canonical_url(article_url))
+    cached = await ARTICLE_CACHE.get(key)
+    if isinstance(cached, NegativeEntry):
+        return None
+
+    if cached is None:
+        # scraped before a restart or by another worker, an unconfirmed copy still beats the feed description
+        stored = await _load_stored(key)
+        if stored is None:
+            return None
+        cached = _from_stored(stored)
+
+    return cached["text"] or None
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from core.config import settings
+from utils.dedup import StoryIndex, minhash
+from utils.urls import normalize_url
+
+# normalized article url -> url of the first copy of that story we saw
+STORY_INDEX = StoryIndex(settings.DEDUP_THRESHOLD, settings.DEDUP_INDEX_MAX_ENTRIES)
+
+
+def _story_text(article: dict) -> str:
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+def collapse_duplicates(articles: list) -> list:
+    # one entry per story, the other outlets carrying it are listed under "duplicates"
+    if not settings.DEDUP_ENABLED:
+        return articles
+
+    stories = OrderedDict()
+    for article in articles:
+        signature = minhash(_story_text(article))
+        if signature:
+            canonical = STORY_INDEX.add(normalize_url(article["article_url"]), signature, article["article_url"])
+        else:
+            canonical = article["article_url"]
+        stories.setdefault(canonical, []).append(article)
+
+    # story_url is kept with the cached feed, so processes reading it from a shared cache resolve the
+    # copies the same way (it is not part of the feed response)
+    collapsed = []
+    for story_url, (lead, *copies) in stories.items():
+        collapsed.append({
+            **lead,
+            "story_url": story_url,
+            "duplicates": [{"source": copy["source"], "article_url": copy["article_url"]} for copy in copies]
+        })
+
+    return collapsed
+
+
+def remember_stories(articles: list):
+    # a feed collapsed by another process, its copies are mapped to the same story here
+    for article in articles:
+        story_url = article.get("story_url")
+        if not story_url:
+            continue
+        for url in [article["article_url"], *(copy["article_url"] for copy in article.get("duplicates", []))]:
+            STORY_INDEX.alias(normalize_url(url), story_url)
+
+
+def canonical_url(article_url: str) -> str:
+    # every copy of a syndicated story resolves to the same url for scraping, summaries and storage
+    return STORY_INDEX.canonical(normalize_url(article_url), article_url)
@@ -0,0 +1,176 @@
+import asyncio
+from openai import OpenAIError
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
+from models.summary_cache import SummaryCache
+from services.scrape_service import get_cached_article_text
+from services.story_service import canonical_url
+from utils.cache import create_cache
+from utils.extractive import summarize_locally
+from utils.llm_governor import get_governor, llm_priority
+from utils.single_flight import SingleFlight
+from utils.summarizer import PROMPT_VERSION, clean_text, stream_summary_article, summarize_article, summary_cache_key
+from utils.urls import normalize_url
+
+SUMMARY_FLIGHTS = SingleFlight()
+
+# hot copy of the summary_cache collection, keyed by content hash
+SUMMARY_CACHE = create_cache(
+    "summaries",
+    max_bytes=settings.SUMMARY_CACHE_MAX_BYTES,
+    ttl=settings.SUMMARY_CACHE_TTL_SECONDS
+)
+
+
+async def _cached_summary(content_hash: str):
+    # syndicated stories share text across many urls, so look the content up before calling the llm
+    result = await SUMMARY_CACHE.get(content_hash)
+    if result is not None:
+        return result
+
+    cached = await SummaryCache.find_one(SummaryCache.content_hash == content_hash)
+    if cached:
+        result = {
+            "summary": cached.summary,
+            "bias": cached.bias
+        }
+        await SUMMARY_CACHE.set(content_hash, result)
+        return result
+    return None
+
+
+async def _store_summary(content_hash: str, result):
+    # only keep well formed llm output, fallbacks like "Summary failed" should be retried later
+    if result and isinstance(result.get("summary"), list) and result.get("bias") not in (None, "Unknown"):
+        await SUMMARY_CACHE.set(content_hash, {"summary": result["summary"], "bias": result["bias"]})
+        try:
+            await SummaryCache(
+                content_hash=content_hash,
+                model=settings.OPENAI_MODEL,
+                prompt_version=PROMPT_VERSION,
+                summary=result["summary"],
+                bias=result["bias"]
+            ).insert()
+        except DuplicateKeyError:
+            pass
+
+
+def _use_local_tier(text: str) -> bool:
+    if settings.SUMMARY_TIER == "local":
+        return True
+    if settings.SUMMARY_TIER == "auto" and settings.SUMMARY_LOCAL_MAX_WORDS > 0:
+        return len(text.split()) <= settings.SUMMARY_LOCAL_MAX_WORDS
+    return False
+
+
+async def _local_summary(text: str) -> dict:
+    # ranking is cpu bound, so it runs in the default executor instead of blocking the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, summarize_locally, clean_text(text or ""))
+
+
+async def _fallback_summary(text: str) -> dict:
+    # shown in place of a failed llm summary but never stored, so the article is summarized again later
+    result = await _local_summary(text)
+    result["fallback"] = True
+    return result
+
+
+async def _summarize_with_llm(text: str):
+    if settings.SUMMARY_LLM_LATENCY_BUDGET_SECONDS <= 0:
+        return await summarize_article(text)
+
+    try:
+        return await asyncio.wait_for(summarize_article(text), timeout=settings.SUMMARY_LLM_LATENCY_BUDGET_SECONDS)
+    except asyncio.TimeoutError:
+        print("LLM summary over latency budget")
+        return None
+
+
+async def _summarize_and_cache(text: str):
+    # local summaries are cheap to recompute, so only llm output goes into the content cache
+    if _use_local_tier(text):
+        return await _local_summary(text)
+
+    content_hash = summary_cache_key(text)
+
+    cached = await _cached_summary(content_hash)
+    if cached:
+        return cached
+
+    result = await _summarize_with_llm(text)
+    if result is None and settings.SUMMARY_LOCAL_FALLBACK:
+        return await _fallback_summary(text)
+
+    await _store_summary(content_hash, result)
+
+    return result
+
+
+async def resolve_article_text(article_url: str, text: str) -> str:
+    # prefer the full scraped text over a feed description when the /detail path already has it
+    scraped = await get_cached_article_text(article_url)
+    if scraped and len(scraped) > len(text or ""):
+        return scraped
+    return text
+
+
+async def find_ready_summary(article_url: str, text: str):
+    # a summary that needs no llm call, from the local tier or the content cache
+    text = await resolve_article_text(article_url, text)
+    if _use_local_tier(text):
+        return await _local_summary(text)
+    return await _cached_summary(summary_cache_key(text))
+
+
+async def _summarize_flight(key: str, text: str):
+    with get_governor().flight(key):
+        return await _summarize_and_cache(text)
+
+
+async def generate_summary(article_url: str, text: str):
+    text = await resolve_article_text(article_url, text)
+    key = normalize_url(canonical_url(article_url))
+
+    # joining a summary prefetch started moves its queued llm call up to this caller's priority
+    get_governor().promote(key, llm_priority.get())
+
+    # concurrent requests for the same story, from any outlet carrying it, share a single LLM call
+    return await SUMMARY_FLIGHTS.do(key, lambda: _summarize_flight(key, text))
+
+
+async def stream_summary(article_url: str, text: str):
+    # same events as stream_summary_article, served from the content cache when possible
+    text = await resolve_article_text(article_url, text)
+
+    if _use_local_tier(text):
+        result = await _local_summary(text)
+        for bullet in result["summary"]:
+            yield "bullet", bullet
+        yield "result", result
+        return
+
+    content_hash = summary_cache_key(text)
+
+    cached = await _cached_summary(content_hash)
+    if cached:
+        for bullet in cached["summary"]:
+            yield "bullet", bullet
+        yield "result", cached
+        return
+
+    started = False
+    try:
+        async for event, value in stream_summary_article(text):
+            if event == "result":
+                await _store_summary(content_hash, value)
+            started = True
+            yield event, value
+    except OpenAIError as e:
+        # once bullets went out the client has a partial llm summary, so only fall back before that
+        if started or not settings.SUMMARY_LOCAL_FALLBACK:
+            raise
+        print("OpenAI error, using local summary", e)
+        result = await _fallback_summary(text)
+        for bullet in result["summary"]:
+            yield "bullet", bullet
+        yield "result", result
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List, Optional
+from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
+from models.saved_article import SavedArticle, SavedArticleUrl
+from models.user import User, UserProfile
+from utils.cache import TTLCache
+
+# short lived per-process cache of the profile fields, which do not change after registration
+# (saved articles are not cached, another worker's save or unsave could not clear this copy)
+USER_CACHE = TTLCache(
+    "users",
+    max_bytes=settings.USER_CACHE_MAX_BYTES,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+async def get_user_profile(user_id: PydanticObjectId) -> Optional[dict]:
+    key = ("profile", user_id)
+    profile = USER_CACHE.get(key)
+
+    if profile is None:
+        doc = await User.find_one(User.id == user_id).project(UserProfile)
+        if not doc:
+            return None
+        profile = doc.model_dump()
+        USER_CACHE.set(key, profile)
+
+    return profile
+
+
+async def get_saved_article_urls(user_id: PydanticObjectId) -> List[str]:
+    # covered by the (user_id, article_url) index
+    docs = await SavedArticle.find(SavedArticle.user_id == user_id).project(SavedArticleUrl).to_list()
+    return [doc.article_url for doc in docs]
+
+
+async def add_saved_article(user_id: PydanticObjectId, article_url: str) -> bool:
+    # single atomic upsert, saving twice keeps the original saved_at, returns whether this was a new save
+    try:
+        result = await SavedArticle.get_pymongo_collection().update_one(
+            {"user_id": user_id, "article_url": article_url},
+            {"$setOnInsert": {"saved_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # a concurrent save of the same article won the race
+        return False
+    return result.upserted_id is not None
+
+
+async def remove_saved_article(user_id: PydanticObjectId, article_url: str):
+    await SavedArticle.find_one(
+        SavedArticle.user_id == user_id,
+        SavedArticle.article_url == article_url
+    ).delete()
+
+
+async def remove_all_saved_articles(user_id: PydanticObjectId):
+    await SavedArticle.find(SavedArticle.user_id == user_id).delete()
@@ -0,0 +1,77 @@
+# The app runs against the local fakes from benchmarks/fakes.py and an in-memory mongo
+# (mongomock-motor). Settings are read at import time, so the environment is set up here,
+# before any test module imports the app.
+import os
+
+from benchmarks.fakes import FakeServices, FakeSettings
+
+FAKE = FakeSettings(feed_latency=0, page_latency=0, openai_latency=0.05, openai_stream_delay=0)
+FAKES = FakeServices(FAKE)
+
+os.environ.update({
+    "JWT_SECRET_KEY": "test-secret",
+    "DB_NAME": "news_app_test",
+    "NEWSDATA_API_URL": f"{FAKES.url}/api/1/latest",
+    "NEWSAPI_API_KEY": "test",
+    "OPENAI_BASE_URL": f"{FAKES.url}/v1",
+    "OPENAI_API_KEY": "test",
+    "OPENAI_MAX_RETRIES": "0",
+    "PREFETCH_ENABLED": "False",
+    "SCRAPED_CONTENT_ENABLED": "False",
+    "CACHE_BACKEND": "memory"
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+import db.connect_db
+
+db.connect_db.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient()
+
+
+@pytest.fixture(scope="session")
+def fake():
+    with FAKES:
+        yield FAKE
+
+
+@pytest.fixture(scope="session")
+def client(fake):
+    # one app and one event loop for the whole session, module level locks and caches are bound to it
+    from main import app
+
+    with TestClient(app) as client:
+        client.post("/api/users/register", json={
+            "first_name": "Test",
+            "last_name": "User",
+            "username": "tester",
+            "email": "tester@example.com",
+            "password": "test-password"
+        })
+        response = client.post("/api/users/login", json={"emailOrUsername": "tester", "password": "test-password"})
+        response.raise_for_status()
+
+        # the auth cookie is marked secure, so it is handed over explicitly instead of by the cookie jar
+        client.cookies.set("access_token", response.cookies["access_token"])
+        yield client
+
+
+@pytest.fixture
+def openai_latency(fake):
+    # restores the fake's latency after a test slows it down
+    original = fake.openai_latency
+    yield lambda seconds: setattr(fake, "openai_latency", seconds)
+    fake.openai_latency = original
+
+
+def article_body(slug: str) -> dict:
+    # long enough for the llm path, short articles are answered without a call,
+    # and unique per slug so the content cache does not answer for another story
+    return {
+        "title": f"Story {slug}",
+        "description": " ".join([f"Officials discussed the {slug} budget plan in detail today."] * 12),
+        "image_url": f"http://example.com/{slug}.jpg",
+        "source": "Wire",
+        "article_url": f"http://example.com/{slug}.html"
+    }
@@ -0,0 +1,92 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from utils import cache
+from utils.cache import NegativeEntry
+
+
+@pytest.fixture(params=["memory", "redis"])
+def make_cache(request, monkeypatch):
+    # both backends are held to the same contract, redis through an in-process fake server
+    if request.param == "redis":
+        monkeypatch.setattr(cache, "_redis", fakeredis.FakeAsyncRedis())
+
+    def make(name="contract", ttl=60, negative_ttl=60):
+        return cache.CACHE_BACKENDS[request.param](name, 1 << 20, ttl, negative_ttl)
+
+    return make
+
+
+def test_values_round_trip(make_cache):
+    async def run():
+        store = make_cache()
+        await store.set("article", {"text": "body", "authors": ["A"]})
+
+        assert await store.get("article") == {"text": "body", "authors": ["A"]}
+        assert await store.get("missing", "default") == "default"
+
+        await store.delete("article")
+        assert await store.get("article") is None
+
+    asyncio.run(run())
+
+
+def test_entries_expire(make_cache):
+    async def run():
+        store = make_cache(ttl=0.05)
+        await store.set("default", "value")
+        await store.set("longer", "value", ttl=5)
+        await asyncio.sleep(0.1)
+
+        assert await store.get("default") is None
+        assert await store.get("longer") == "value"
+
+    asyncio.run(run())
+
+
+def test_negative_entries(make_cache):
+    async def run():
+        store = make_cache(negative_ttl=0.05)
+        await store.set_negative("gone", "Article not found")
+
+        entry = await store.get("gone")
+        assert isinstance(entry, NegativeEntry)
+        assert entry.detail == "Article not found"
+        assert store.stats()["negative_hits"] == 1
+
+        await asyncio.sleep(0.1)
+        assert await store.get("gone") is None
+
+        # a negative ttl of 0 turns negative caching off
+        disabled = make_cache(name="no-negatives", negative_ttl=0)
+        await disabled.set_negative("gone", "Article not found")
+        assert await disabled.get("gone") is None
+
+    asyncio.run(run())
+
+
+def test_caches_do_not_share_keys(make_cache):
+    async def run():
+        articles, feeds = make_cache(name="articles"), make_cache(name="feeds")
+        await articles.set("key", "article")
+        await feeds.set("key", "feed")
+
+        assert await articles.get("key") == "article"
+        assert await feeds.get("key") == "feed"
+
+    asyncio.run(run())
+
+
+def test_redis_keys_use_the_namespace(monkeypatch):
+    async def run():
+        monkeypatch.setattr(cache.settings, "CACHE_NAMESPACE", "tenant")
+        server = fakeredis.FakeAsyncRedis()
+        monkeypatch.setattr(cache, "_redis", server)
+
+        await cache.RedisCache("articles", 0, 60).set("key", "value")
+
+        assert await server.keys("*") == [b"tenant:articles:key"]
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+import time
+
+import fakeredis
+
+from core.config import settings
+from services import feed_service, story_service
+from utils import cache
+from services.story_service import canonical_url, collapse_duplicates
+from utils.dedup import StoryIndex, minhash, similarity
+
+
+def _story(source: str, slug: str, title: str, description: str) -> dict:
+    return {
+        "title": title,
+        "description": description,
+        "image_url": None,
+        "source": source,
+        "article_url": f"https://{source.lower()}.example.com/{slug}"
+    }
+
+
+def test_syndicated_copies_collapse_into_one_story(monkeypatch):
+    monkeypatch.setattr(story_service, "STORY_INDEX", StoryIndex(settings.DEDUP_THRESHOLD, 100))
+
+    description = "The city council approved a new budget on Tuesday that raises spending on schools, roads and public transit."
+    lead = _story("Wire", "budget", "City council approves new budget", description)
+    copy = _story("Daily", "council-budget", "City council approves new budget", description + " Reporting by staff.")
+    other = _story("Herald", "football", "Local team wins the cup final", "The home side scored twice late in the second half to win the final.")
+
+    collapsed = collapse_duplicates([lead, copy, other])
+
+    assert [story["article_url"] for story in collapsed] == [lead["article_url"], other["article_url"]]
+    assert collapsed[0]["duplicates"] == [{"source": "Daily", "article_url": copy["article_url"]}]
+    assert collapsed[1]["duplicates"] == []
+
+    # every copy resolves to the first one seen, unrelated stories to themselves
+    assert canonical_url(copy["article_url"]) == lead["article_url"]
+    assert canonical_url(other["article_url"]) == other["article_url"]
+    assert canonical_url("https://unknown.example.com/story") == "https://unknown.example.com/story"
+
+
+def test_minhash_estimates_similarity():
+    text = "the city council approved a new budget that raises spending on schools and roads"
+
+    assert minhash("") is None
+    assert similarity(minhash(text), minhash(text)) == 1
+    assert similarity(minhash(text), minhash("the home side scored twice late in the second half to win")) < 0.2
+
+
+def test_workers_reading_a_shared_feed_resolve_copies_the_same_way(client, monkeypatch):
+    monkeypatch.setattr(story_service, "STORY_INDEX", StoryIndex(settings.DEDUP_THRESHOLD, 100))
+
+    description = "Storms closed the coastal highway overnight and crews expect to reopen it by Friday afternoon."
+    lead = _story("Wire", "storm", "Storms close coastal highway", description)
+    copy = _story("Daily", "highway-storm", "Storms close coastal highway", description)
+    feed = collapse_duplicates([lead, copy])
+
+    # another worker: an empty story index and the feed collapsed above, read from redis
+    monkeypatch.setattr(story_service, "STORY_INDEX", StoryIndex(settings.DEDUP_THRESHOLD, 100))
+    monkeypatch.setattr(cache, "_redis", fakeredis.FakeAsyncRedis())
+    shared = cache.RedisCache("feeds-test", 0, 60)
+    monkeypatch.setattr(feed_service, "FEED_CACHE", shared)
+    client.portal.call(shared.set, "weather", [time.time(), feed])
+
+    assert canonical_url(copy["article_url"]) == copy["article_url"]
+    client.portal.call(feed_service.get_feed, None, "weather")
+    assert canonical_url(copy["article_url"]) == lead["article_url"]
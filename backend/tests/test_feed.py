@@ -0,0 +1,32 @@
+from routes import articles
+from schemas.articles import FeedArticle
+from services.article_service import find_summarized_article, upsert_article
+
+
+def test_feed_items_without_title_or_source(client, monkeypatch):
+    async def feed(http_client, query):
+        return [{
+            "title": None,
+            "description": None,
+            "image_url": None,
+            "source": None,
+            "article_url": "http://example.com/untitled.html",
+            "duplicates": [{"source": None, "article_url": "http://example.com/untitled-copy.html"}]
+        }]
+
+    monkeypatch.setattr(articles, "get_feed", feed)
+    response = client.get("/api/articles/technology")
+
+    assert response.status_code == 200
+    assert response.json()[0]["title"] is None
+
+
+def test_prefetched_article_without_title_or_source(client):
+    # prefetch stores feed items as they are, reading them back must not fail validation
+    item = FeedArticle(article_url="http://example.com/untitled-prefetch.html", description="Text")
+    client.portal.call(upsert_article, item, ["First point"], "Low")
+
+    article = client.portal.call(find_summarized_article, item.article_url)
+
+    assert article.title is None
+    assert article.summary == ["First point"]
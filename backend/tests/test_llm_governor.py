@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+from openai import APITimeoutError, InternalServerError
+
+from utils.llm_governor import INTERACTIVE, RateGovernor, background_priority
+
+
+def _governor(**overrides):
+    options = {"rpm": 0, "tpm": 0, "min_concurrency": 1, "max_concurrency": 1, "target_latency": 0}
+    return RateGovernor(**{**options, **overrides})
+
+
+def test_joining_a_background_flight_promotes_its_queued_call():
+    async def run():
+        governor = _governor()
+        order = []
+        busy = asyncio.Event()
+
+        async def hold():
+            async with governor.slot(10):
+                await busy.wait()
+
+        async def background(name, flight=None):
+            with background_priority():
+                if flight is None:
+                    async with governor.slot(10):
+                        order.append(name)
+                    return
+                with governor.flight(flight):
+                    async with governor.slot(10):
+                        order.append(name)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(background(f"prefetch-{index}")) for index in range(3)]
+        queued.append(asyncio.create_task(background("joined", flight="story")))
+        await asyncio.sleep(0)
+
+        # a user asks for the story prefetch is already summarizing
+        governor.promote("story", INTERACTIVE)
+        busy.set()
+        await asyncio.gather(holder, *queued)
+
+        assert order[0] == "joined"
+
+    asyncio.run(run())
+
+
+def test_timeouts_and_server_errors_shrink_the_limit():
+    request = httpx.Request("POST", "http://openai.test/v1/chat/completions")
+    errors = [
+        APITimeoutError(request=request),
+        InternalServerError("overloaded", response=httpx.Response(503, request=request), body=None)
+    ]
+
+    async def run():
+        governor = _governor(max_concurrency=10)
+
+        for error in errors:
+            limit = governor.limit
+            try:
+                async with governor.slot(10):
+                    raise error
+            except type(error):
+                pass
+
+            assert governor.limit == limit * 0.9
+
+    asyncio.run(run())
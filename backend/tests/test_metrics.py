@@ -0,0 +1,19 @@
+from core.config import settings
+
+
+def test_metrics_need_the_admin_key(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "scrape-key")
+
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+    for headers in ({"X-Admin-Key": "scrape-key"}, {"Authorization": "Bearer scrape-key"}):
+        response = client.get("/metrics", headers=headers)
+        assert response.status_code == 200
+        assert "news_cache_hits_total" in response.text
+
+
+def test_metrics_are_closed_without_an_admin_key(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "")
+
+    assert client.get("/metrics", headers={"X-Admin-Key": ""}).status_code == 403
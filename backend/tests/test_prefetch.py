@@ -0,0 +1,48 @@
+from benchmarks.fakes import SUMMARY
+from schemas.articles import FeedArticle
+from services.prefetch_service import HourlyBudget, PrefetchScheduler
+from tests.conftest import FAKES, article_body
+from utils.summarizer import estimate_llm_calls
+
+
+def test_cached_summaries_do_not_use_llm_budget(client, fake):
+    body = article_body("prefetch-cached")
+    assert client.post("/api/articles/summarize", json=body).status_code == 200
+
+    scheduler = PrefetchScheduler(http_client=None)
+    scheduler.llm_budget = HourlyBudget(1)
+    calls_before = fake.calls.get("openai", 0)
+
+    # another outlet's copy of the same text, its page cannot be scraped so the description is used
+    item = FeedArticle(**{**body, "article_url": f"{FAKES.url}/missing/copy"})
+    result = client.portal.call(scheduler._warm, item)
+
+    assert result["summary"] == SUMMARY["summary"]
+    assert scheduler.llm_budget.remaining() == 1
+    assert fake.calls.get("openai", 0) == calls_before
+
+
+def test_long_articles_are_charged_for_every_llm_call(client, fake):
+    description = " ".join(
+        f"Section {index} of the council report lists spending on roads, schools and parks in detail."
+        for index in range(600)
+    )
+    item = FeedArticle(**{**article_body("prefetch-long"), "description": description, "article_url": f"{FAKES.url}/missing/long"})
+
+    # chunked into several map calls plus the final one
+    expected = estimate_llm_calls(description)
+    assert expected > 2
+
+    scheduler = PrefetchScheduler(http_client=None)
+    scheduler.llm_budget = HourlyBudget(expected - 1)
+    calls_before = fake.calls.get("openai", 0)
+
+    assert client.portal.call(scheduler._warm, item) is None
+    assert scheduler.llm_budget.remaining() == expected - 1
+    assert fake.calls.get("openai", 0) == calls_before
+
+    scheduler.llm_budget = HourlyBudget(expected)
+
+    assert client.portal.call(scheduler._warm, item)["summary"] == SUMMARY["summary"]
+    assert scheduler.llm_budget.remaining() == 0
+    assert fake.calls.get("openai", 0) == calls_before + expected
@@ -0,0 +1,101 @@
+from beanie import PydanticObjectId
+
+from models.saved_article import SavedArticle
+from schemas.articles import SaveArticleRequest
+from services.article_service import list_saved_articles, save_article_for_user, upsert_article
+from services.user_service import add_saved_article
+from tests.conftest import article_body
+from utils.pagination import encode_cursor
+
+
+def _saved_ids(client):
+    return client.get("/api/articles/saved-articles-ids").json()
+
+
+def _save(client, user_id, slug: str) -> str:
+    body = SaveArticleRequest(**article_body(slug))
+    client.portal.call(upsert_article, body)
+    client.portal.call(add_saved_article, user_id, body.article_url)
+    return body.article_url
+
+
+def test_saved_pages_follow_on_from_each_other(client):
+    # a user of its own, so the total does not depend on what other tests saved
+    user_id = PydanticObjectId()
+    urls = [_save(client, user_id, f"page-{index}") for index in range(7)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = client.portal.call(list_saved_articles, user_id, cursor, 3, None)
+        assert page["total"] == 7
+        seen += [item["article_url"] for item in page["items"]]
+        pages += 1
+
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # in save order, nothing skipped or repeated across pages
+    assert seen == urls
+    assert pages == 3
+
+
+def test_saved_articles_fields_projection(client):
+    user_id = PydanticObjectId()
+    _save(client, user_id, "projected")
+
+    page = client.portal.call(list_saved_articles, user_id, None, 10, ("title",))
+
+    assert page["items"] == [{"article_url": "http://example.com/projected.html", "title": "Story projected"}]
+
+    response = client.get("/api/articles/saved-articles", params={"fields": "title,bias"})
+    assert response.status_code == 200
+    assert all(set(item) <= {"article_url", "title", "bias"} for item in response.json()["items"])
+
+
+def test_saved_articles_rejects_bad_queries(client):
+    for cursor in ["not-a-cursor", encode_cursor({"saved_at": "yesterday", "id": "1"})]:
+        response = client.get("/api/articles/saved-articles", params={"cursor": cursor})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+    response = client.get("/api/articles/saved-articles", params={"fields": "title,password"})
+    assert response.status_code == 400
+
+
+def test_saved_ids_see_changes_made_by_other_workers(client):
+    body = article_body("saved-elsewhere")
+    assert client.post("/api/articles/save-article", json=body).status_code == 200
+    assert body["article_url"] in _saved_ids(client)
+
+    # another worker's unsave goes straight to mongo, nothing in this process is told about it
+    client.portal.call(SavedArticle.get_pymongo_collection().delete_many, {"article_url": body["article_url"]})
+
+    assert body["article_url"] not in _saved_ids(client)
+
+
+def test_save_unsave_save(client):
+    body = article_body("saved-again")
+
+    def rows():
+        return client.portal.call(SavedArticle.get_pymongo_collection().count_documents, {"article_url": body["article_url"]})
+
+    assert client.post("/api/articles/save-article", json=body).status_code == 200
+    assert client.delete("/api/articles/remove-article", params={"article_url": body["article_url"]}).status_code == 200
+    assert rows() == 0
+
+    assert client.post("/api/articles/save-article", json=body).status_code == 200
+    assert rows() == 1
+    assert body["article_url"] in _saved_ids(client)
+
+    # saving again is a no-op
+    assert client.post("/api/articles/save-article", json=body).status_code == 200
+    assert rows() == 1
+
+
+def test_saving_twice_reports_already_saved(client):
+    user_id = PydanticObjectId()
+    body = SaveArticleRequest(**article_body("saved-twice"))
+
+    assert "title" in client.portal.call(save_article_for_user, user_id, body)
+    assert client.portal.call(save_article_for_user, user_id, body) == {"message": "Article already saved"}
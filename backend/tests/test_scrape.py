@@ -0,0 +1,30 @@
+import zlib
+from datetime import datetime, timedelta
+
+from core.config import settings
+from models.scraped_content import ScrapedContent
+from services.scrape_service import ARTICLE_CACHE
+from tests.conftest import FAKES
+from utils.cache import NegativeEntry
+from utils.urls import normalize_url
+
+
+def test_removed_article_is_not_served_from_the_store(client, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPED_CONTENT_ENABLED", True)
+
+    # stored a day ago, so the publisher is asked again and now answers 404
+    article_url = f"{FAKES.url}/missing/taken-down.html"
+    key = normalize_url(article_url)
+    client.portal.call(ScrapedContent(
+        key=key,
+        article_url=article_url,
+        title="Taken down",
+        body=zlib.compress(b"Text the publisher removed."),
+        fetched_at=datetime.utcnow() - timedelta(days=1)
+    ).insert)
+
+    response = client.get("/api/articles/detail", params={"article_url": article_url})
+
+    assert response.status_code == 500
+    assert client.portal.call(ScrapedContent.find_one, ScrapedContent.key == key) is None
+    assert isinstance(client.portal.call(ARTICLE_CACHE.get, key), NegativeEntry)
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from core.config import settings
+from models.article import Article
+from services.article_service import search_articles
+from utils.pagination import decode_cursor, encode_cursor
+
+
+class RecordedSearch:
+    # stands in for the articles collection, mongomock has no $text, so the query itself is checked
+    def __init__(self, results: int):
+        self.results = results
+        self.fields = {"title": "Budget vote", "source": "Wire"}
+        self.calls = []
+
+    def find(self, query, projection):
+        self.calls.append({"query": query, "projection": projection})
+        return self
+
+    def sort(self, keys):
+        self.calls[-1]["sort"] = keys
+        return self
+
+    def skip(self, offset):
+        self.calls[-1]["skip"] = offset
+        return self
+
+    def limit(self, limit):
+        self.calls[-1]["limit"] = limit
+        return self
+
+    async def to_list(self, length):
+        start = self.calls[-1]["skip"]
+        found = range(start, min(self.results, start + length))
+        return [{"article_url": f"http://example.com/{index}.html", **self.fields, "score": 1.0} for index in found]
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    recorded = RecordedSearch(results=25)
+    monkeypatch.setattr(Article, "get_pymongo_collection", classmethod(lambda cls: recorded))
+    return recorded
+
+
+def test_search_builds_filters_ranking_and_projection(client, collection):
+    date_from, date_to = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    client.portal.call(search_articles, "budget vote", "Wire", "Low", date_from, date_to, None, 10)
+
+    call = collection.calls[0]
+    assert call["query"] == {
+        "$text": {"$search": "budget vote"},
+        "source": "Wire",
+        "bias": "Low",
+        "created_at": {"$gte": date_from, "$lte": date_to}
+    }
+    assert call["projection"]["_id"] == 0
+    assert call["projection"]["score"] == {"$meta": "textScore"}
+    assert {field for field, value in call["projection"].items() if value == 1} == {
+        "title", "description", "image_url", "source", "article_url", "summary", "bias", "created_at"
+    }
+    # best match first, newer articles break ties
+    assert call["sort"] == [("score", {"$meta": "textScore"}), ("created_at", -1)]
+
+
+def test_search_without_filters_only_matches_text(client, collection):
+    client.portal.call(search_articles, "budget", None, None, None, None, None, 10)
+
+    assert collection.calls[0]["query"] == {"$text": {"$search": "budget"}}
+
+
+def test_search_pages_through_results(client, collection):
+    seen, cursor = [], None
+    while True:
+        page = client.portal.call(search_articles, "budget", None, None, None, None, cursor, 10)
+        seen += [item["article_url"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [call["skip"] for call in collection.calls] == [0, 10, 20]
+    assert all(call["limit"] == 11 for call in collection.calls)
+    assert seen == [f"http://example.com/{index}.html" for index in range(25)]
+
+
+def test_search_route_returns_the_next_cursor(client, collection):
+    response = client.get("/api/articles/search", params={"q": "budget", "limit": 5})
+
+    assert response.status_code == 200
+    assert decode_cursor(response.json()["next_cursor"]) == {"offset": 5}
+
+
+def test_search_hits_without_title_or_source(client, collection):
+    # prefetch stores feed items newsdata sent without a title or source
+    collection.fields = {"title": None, "source": None}
+    response = client.get("/api/articles/search", params={"q": "budget"})
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] is None
+
+
+def test_search_stops_at_the_result_limit(client, collection, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_RESULTS", 20)
+
+    page = client.portal.call(search_articles, "budget", None, None, None, None, encode_cursor({"offset": 10}), 10)
+    assert page["next_cursor"] is None
+
+    response = client.get("/api/articles/search", params={"q": "budget", "cursor": encode_cursor({"offset": 20})})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("offset", [-20, "20", 2.5, None])
+def test_search_rejects_tampered_cursor(client, offset):
+    response = client.get("/api/articles/search", params={"q": "budget", "cursor": encode_cursor({"offset": offset})})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
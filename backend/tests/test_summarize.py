@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import SUMMARY
+from tests.conftest import article_body
+
+
+def test_summarize_returns_llm_summary(client, fake):
+    response = client.post("/api/articles/summarize", json=article_body("plain"))
+
+    assert response.status_code == 200
+    assert response.json()["summary"] == SUMMARY["summary"]
+    assert response.json()["bias"] == "Low"
+
+
+def test_other_endpoints_keep_serving_while_summaries_are_slow(client, fake, openai_latency):
+    openai_latency(1.5)
+    calls_before = fake.calls.get("openai", 0)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        summaries = [
+            pool.submit(client.post, "/api/articles/summarize", json=article_body(f"slow-{index}"))
+            for index in range(4)
+        ]
+
+        # wait until the llm calls are actually in flight
+        deadline = time.monotonic() + 5
+        while fake.calls.get("openai", 0) < calls_before + 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started = time.monotonic()
+        health = client.get("/health")
+        saved = client.get("/api/articles/saved-articles-ids")
+        elapsed = time.monotonic() - started
+
+        assert health.status_code == 200
+        assert saved.status_code == 200
+        assert elapsed < 0.5
+        assert not any(summary.done() for summary in summaries)
+
+        assert [summary.result().status_code for summary in summaries] == [200] * 4
+
+
+
+def test_fallback_summary_is_not_stored(client, fake, monkeypatch):
+    from services import summary_service
+    from services.article_service import find_summarized_article
+
+    async def llm_failed(text):
+        return None
+
+    body = article_body("fallback")
+
+    monkeypatch.setattr(summary_service, "_summarize_with_llm", llm_failed)
+    response = client.post("/api/articles/summarize", json=body)
+
+    assert response.status_code == 200
+    assert response.json()["summary"] != SUMMARY["summary"]
+    assert client.portal.call(find_summarized_article, body["article_url"]) is None
+
+    # the next request gets the llm summary instead of the stored fallback
+    monkeypatch.undo()
+    response = client.post("/api/articles/summarize", json=body)
+
+    assert response.json()["summary"] == SUMMARY["summary"]
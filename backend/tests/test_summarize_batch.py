@@ -0,0 +1,54 @@
+import json
+
+from benchmarks.fakes import SUMMARY
+from models.article import Article
+from routes import articles
+from tests.conftest import article_body
+
+
+def test_batch_answers_in_input_order(client, fake, monkeypatch):
+    stored = article_body("batch-stored")
+    assert client.post("/api/articles/summarize", json=stored).status_code == 200
+
+    first, second = article_body("batch-miss-1"), article_body("batch-miss-2")
+    failing = article_body("batch-failing")
+    no_description = {**article_body("batch-empty"), "description": ""}
+
+    generate_summary = articles.generate_summary
+
+    async def summarize(article_url, text):
+        if article_url == failing["article_url"]:
+            return None
+        return await generate_summary(article_url, text)
+
+    # every stored summary in the batch is found with one query
+    lookups = []
+    find = Article.find
+
+    def counted_find(*args, **kwargs):
+        lookups.append(args)
+        return find(*args, **kwargs)
+
+    monkeypatch.setattr(articles, "generate_summary", summarize)
+    monkeypatch.setattr(Article, "find", counted_find)
+    calls_before = fake.calls.get("openai", 0)
+
+    body = [first, stored, no_description, failing, second]
+    response = client.post("/api/articles/summarize-batch", json=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["article_url"] for line in lines] == [item["article_url"] for item in body]
+
+    assert lines[0]["summary"] == SUMMARY["summary"]
+    assert lines[1]["summary"] == SUMMARY["summary"]
+    assert lines[2]["error"] == "Article description required"
+    assert lines[3]["error"] == "AI summarization failed"
+    assert lines[4]["summary"] == SUMMARY["summary"]
+
+    assert len(lookups) == 1
+    assert set(lookups[0][0].query["article_url"]["$in"]) >= {item["article_url"] for item in body}
+    # only the two misses reached the llm, the stored article and the failures did not
+    assert fake.calls.get("openai", 0) == calls_before + 2
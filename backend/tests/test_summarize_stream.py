@@ -0,0 +1,45 @@
+import json
+
+from benchmarks.fakes import SUMMARY
+from tests.conftest import article_body
+
+
+def read_events(response) -> list:
+    events = []
+    for block in response.text.split("\n\n"):
+        if not block.strip():
+            continue
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_bullets_then_result(client, fake):
+    calls_before = fake.calls.get("openai", 0)
+
+    with client.stream("POST", "/api/articles/summarize-stream", json=article_body("streamed")) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        response.read()
+
+    events = read_events(response)
+    names = [name for name, _ in events]
+
+    assert names == ["bullet"] * 5 + ["bias", "done"]
+    assert [data["text"] for _, data in events[:5]] == SUMMARY["summary"]
+    assert [data["index"] for _, data in events[:5]] == list(range(5))
+    assert events[5][1] == {"bias": SUMMARY["bias"]}
+    assert events[6][1]["summary"] == SUMMARY["summary"]
+    assert fake.calls.get("openai", 0) == calls_before + 1
+
+
+def test_stream_replays_stored_summary(client, fake):
+    body = article_body("replayed")
+    first = read_events(client.post("/api/articles/summarize-stream", json=body))
+    calls_before = fake.calls.get("openai", 0)
+
+    replay = read_events(client.post("/api/articles/summarize-stream", json=body))
+
+    # same events from the stored article, without another llm call
+    assert replay == first
+    assert fake.calls.get("openai", 0) == calls_before
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+
+from utils import tokens
+from utils.tokens import chunk_sentences, clip_to_tokens, count_tokens
+
+
+def test_chunks_stay_within_budget_even_for_one_long_sentence():
+    long_sentence = "Word " + " ".join(["word"] * 500) + "."
+    text = f"A short opening sentence. {long_sentence} Another short sentence. And one more."
+
+    chunks = chunk_sentences(text, 100)
+
+    assert len(chunks) > 3
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert chunks[0] == "A short opening sentence."
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_clip_cuts_an_oversized_first_sentence_between_words():
+    clipped = clip_to_tokens(" ".join(["word"] * 500), 50)
+
+    assert count_tokens(clipped) <= 50
+    assert set(clipped.split()) == {"word"}
+
+
+def test_tokenizer_that_loads_too_late_is_not_used(monkeypatch):
+    loaded = threading.Event()
+
+    def slow_load(model):
+        time.sleep(0.2)
+        loaded.set()
+        return object()
+
+    monkeypatch.setattr(tokens, "_encodings", {})
+    monkeypatch.setattr(tokens, "_load_encoding", slow_load)
+
+    asyncio.run(tokens.load_tokenizer(timeout=0.05))
+    loaded.wait(1)
+
+    # estimated from the start, and still estimated after the download finished
+    assert count_tokens("x" * 40) == 10
@@ -1,12 +1,24 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 import uuid
 
 from core.config import settings
+from utils.metrics import timed
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM
+)
+
+# argon2 is cpu and memory bound, so it runs in its own processes instead of on the event loop
+_hash_executor: Optional[ProcessPoolExecutor] = None
 
 
 def hash_password(password: str) -> str:
@@ -17,7 +29,41 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
+def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    # returns a new hash when the stored one was made with outdated argon2 parameters
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    with timed("password"):
+        return await loop.run_in_executor(_get_hash_executor(), hash_password, password)
+
+
+async def verify_and_update_password_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    with timed("password"):
+        return await loop.run_in_executor(_get_hash_executor(), verify_and_update_password, password, hashed)
+
+
+def create_access_token(subject: str, expires_delta: Optional[timedelta] = None, claims: Optional[dict] = None) -> str:
     now = datetime.utcnow()
     if expires_delta:
         expire = now + expires_delta
@@ -28,7 +74,9 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
         "exp": expire,
         "iat": now,
         "sub": subject,
-        "jti": str(uuid.uuid4())
+        "jti": str(uuid.uuid4()),
+        # identity claims let requests skip loading the user document
+        **(claims or {})
     }
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
 
@@ -56,7 +104,8 @@ def create_refresh_token(subject: str, expires_delta: Optional[timedelta] = None
 
 def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+        with timed("jwt"):
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError as e:
         raise e
@@ -0,0 +1,299 @@
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from core.config import settings
+
+# redis is optional, it is only needed with CACHE_BACKEND=redis
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+
+# every cache registers itself here so the admin endpoint can report on all of them
+CACHES: Dict[str, Any] = {}
+
+
+class NegativeEntry:
+    # cached marker for a key whose lookup failed (e.g. a url that could not be scraped)
+    __slots__ = ("detail",)
+
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+def estimate_size(value: Any) -> int:
+    # rough payload size in bytes, dominated by the article text
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, NegativeEntry):
+        return estimate_size(value.detail)
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        ttl: float,
+        negative_ttl: float = 0,
+        sizeof: Callable[[Any], int] = estimate_size,
+        register: bool = True
+    ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.sizeof = sizeof
+
+        # key -> (expires_at, size, value), ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if register:
+            CACHES[name] = self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        if isinstance(value, NegativeEntry):
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        size = self.sizeof(value)
+
+        if key in self._entries:
+            self._remove(key)
+
+        # a single entry larger than the whole budget is never cached
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+
+        self._evict()
+
+    def set_negative(self, key: Hashable, detail: str):
+        if self.negative_ttl > 0:
+            self.set(key, NegativeEntry(detail), ttl=self.negative_ttl)
+
+    def delete(self, key: Hashable):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+
+        now = time.monotonic()
+
+        # drop expired entries first, then least recently used ones until we fit
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+            self.expirations += 1
+
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+_redis = None
+
+
+def get_redis():
+    global _redis
+
+    if _redis is None:
+        _redis = aioredis.from_url(settings.REDIS_URL)
+
+    return _redis
+
+
+async def close_redis():
+    global _redis
+
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+class MemoryCache:
+    # async front for a TTLCache, so services do not care which backend they run on
+    backend = "memory"
+
+    def __init__(self, name: str, max_bytes: int, ttl: float, negative_ttl: float = 0):
+        self.name = name
+        self.local = TTLCache(name, max_bytes, ttl, negative_ttl, register=False)
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return self.local.get(key, default)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+
+    async def set_negative(self, key: str, detail: str):
+        self.local.set_negative(key, detail)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, **self.local.stats()}
+
+
+class RedisCache:
+    # shared by every worker and replica, values are stored as json under <namespace>:<cache name>:<key>
+    backend = "redis"
+
+    def __init__(self, name: str, max_bytes: int, ttl: float, negative_ttl: float = 0):
+        if aioredis is None:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package")
+
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.prefix = f"{settings.CACHE_NAMESPACE}:{name}:"
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = await get_redis().get(self._key(key))
+        except aioredis.RedisError as e:
+            # an unreachable cache is treated as a miss, never as a failed request
+            print("Cache read error", self.name, e)
+            self.errors += 1
+            self.misses += 1
+            return default
+
+        if raw is None:
+            self.misses += 1
+            return default
+
+        entry = json.loads(raw)
+        if "negative" in entry:
+            self.negative_hits += 1
+            return NegativeEntry(entry["negative"])
+
+        self.hits += 1
+        return entry["value"]
+
+    async def _write(self, key: str, entry: dict, ttl: float):
+        try:
+            await get_redis().set(self._key(key), json.dumps(entry), px=max(1, int(ttl * 1000)))
+        except aioredis.RedisError as e:
+            print("Cache write error", self.name, e)
+            self.errors += 1
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self._write(key, {"value": value}, self.ttl if ttl is None else ttl)
+
+    async def set_negative(self, key: str, detail: str):
+        if self.negative_ttl > 0:
+            await self._write(key, {"negative": detail}, self.negative_ttl)
+
+    async def delete(self, key: str):
+        try:
+            await get_redis().delete(self._key(key))
+        except aioredis.RedisError as e:
+            print("Cache delete error", self.name, e)
+            self.errors += 1
+
+    def stats(self) -> dict:
+        # entry counts and memory belong to redis itself, these are this process's lookups
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+CACHE_BACKENDS = {
+    "memory": MemoryCache,
+    "redis": RedisCache
+}
+
+
+def create_cache(name: str, max_bytes: int, ttl: float, negative_ttl: float = 0):
+    # max_bytes only bounds the in-process backend, redis is bounded by its own maxmemory policy
+    cache = CACHE_BACKENDS[settings.CACHE_BACKEND](name, max_bytes, ttl, negative_ttl)
+    CACHES[name] = cache
+    return cache
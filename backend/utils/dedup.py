@@ -0,0 +1,122 @@
+import hashlib
+import random
+import re
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+import numpy as np
+
+WORD = re.compile(r"[a-z0-9]+")
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# universal hashing modulo a mersenne prime, small enough that a * h + b fits in an int64
+PRIME = (1 << 31) - 1
+
+_rng = random.Random(1)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+_A = np.array([a for a, _ in PERMUTATIONS], dtype=np.int64)
+_B = np.array([b for _, b in PERMUTATIONS], dtype=np.int64)
+
+
+def shingles(text: str) -> Set[str]:
+    words = WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _hash(shingle: str) -> int:
+    # stable across processes, unlike the builtin hash()
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big") % PRIME
+
+
+def minhash(text: str) -> Optional[Tuple[int, ...]]:
+    hashes = [_hash(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+
+    values = np.array(hashes, dtype=np.int64)
+    return tuple(((np.outer(_A, values) + _B[:, None]) % PRIME).min(axis=1).tolist())
+
+
+def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    # fraction of matching minhashes estimates the jaccard similarity of the shingle sets
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERM
+
+
+def _bands(signature: Tuple[int, ...]):
+    return [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+class StoryIndex:
+    # lsh index over minhash signatures, every key maps to the canonical value of its cluster
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        # key -> (signature, canonical), ordered from least to most recently seen
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[Hashable]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def canonical(self, key: Hashable, default=None):
+        entry = self._entries.get(key)
+        return entry[1] if entry else default
+
+    def add(self, key: Hashable, signature: Tuple[int, ...], value) -> object:
+        # returns the canonical value for key, which is value itself when it starts a new cluster
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        candidates = set()
+        for bucket in _bands(signature):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        best = None
+        best_score = self.threshold
+        for candidate in candidates:
+            score = similarity(signature, self._entries[candidate][0])
+            if score >= best_score:
+                best, best_score = candidate, score
+
+        canonical = self._entries[best][1] if best is not None else value
+
+        self._entries[key] = (signature, canonical)
+        for bucket in _bands(signature):
+            self._buckets.setdefault(bucket, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+        return canonical
+
+    def alias(self, key: Hashable, canonical):
+        # a mapping decided elsewhere (another process), kept without a signature so nothing clusters on it
+        if key in self._entries:
+            return
+        self._entries[key] = (None, canonical)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _remove(self, key: Hashable):
+        signature, _ = self._entries.pop(key)
+        if signature is None:
+            return
+        for bucket in _bands(signature):
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
@@ -0,0 +1,131 @@
+import re
+from collections import Counter
+from typing import List
+import numpy as np
+from utils.tokens import split_sentences
+
+WORD = re.compile(r"[a-z][a-z'-]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over
+own said same says she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which while
+who whom why will with would you your yours yourself yourselves
+""".split())
+
+# words that signal opinion or emotionally loaded framing rather than neutral reporting
+LOADED_WORDS = frozenset("""
+absurd alarming appalling astonishing atrocious awful betrayal blatant brutal catastrophe
+catastrophic chaos corrupt cowardly crazy crisis dangerous devastating disaster disastrous
+disgraceful disgusting dishonest evil extreme extremist fake fiasco furious hateful heroic
+horrible horrific humiliating hypocrisy hypocrite idiotic incompetent insane lies lunatic
+massive misleading monstrous outrage outrageous pathetic radical reckless ridiculous
+scandal scandalous shameful shameless shocking slammed stunning terrible thug traitor
+tyranny unhinged unprecedented vile villain war weak woke
+""".split())
+
+HEDGE_WORDS = frozenset("""
+allegedly apparently arguably clearly obviously undoubtedly supposedly so-called
+""".split())
+
+DAMPING = 0.85
+ITERATIONS = 30
+
+# the similarity matrix grows with the square of the sentence count, news text front-loads the
+# important sentences so only the start of a long article is ranked
+MAX_SENTENCES = 150
+
+
+def _words(sentence: str) -> List[str]:
+    return [word for word in WORD.findall(sentence.lower()) if word not in STOPWORDS]
+
+
+def _similarity_numpy(bags: List[Counter], vocabulary: dict):
+    tf = np.zeros((len(bags), len(vocabulary)))
+    for row, bag in enumerate(bags):
+        for word, count in bag.items():
+            tf[row, vocabulary[word]] = count
+
+    df = np.count_nonzero(tf, axis=0)
+    tfidf = tf * (np.log((1 + len(bags)) / (1 + df)) + 1)
+
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    tfidf /= norms
+
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+
+def _textrank_numpy(similarity) -> List[float]:
+    size = len(similarity)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    out_weight[out_weight == 0] = 1
+    transition = (similarity / out_weight).T
+
+    scores = np.full(size, 1 / size)
+    for _ in range(ITERATIONS):
+        scores = (1 - DAMPING) / size + DAMPING * transition @ scores
+
+    return scores.tolist()
+
+
+def rank_sentences(sentences: List[str]) -> List[float]:
+    # TextRank over tf-idf cosine similarity between sentences
+    bags = [Counter(_words(sentence)) for sentence in sentences]
+
+    vocabulary = {}
+    for bag in bags:
+        for word in bag:
+            vocabulary.setdefault(word, len(vocabulary))
+
+    if not vocabulary:
+        return [0.0] * len(sentences)
+
+    return _textrank_numpy(_similarity_numpy(bags, vocabulary))
+
+
+def summarize_extractive(text: str, num_sentences: int = 5) -> List[str]:
+    # repeated sentences (boilerplate, pull quotes) would otherwise reinforce each other into the top picks
+    sentences = list(dict.fromkeys(
+        sentence.strip() for sentence in split_sentences(text) if len(sentence.split()) >= 4
+    ))[:MAX_SENTENCES]
+
+    if len(sentences) <= num_sentences:
+        return sentences or [text.strip()]
+
+    scores = rank_sentences(sentences)
+    top = sorted(range(len(sentences)), key=lambda index: scores[index], reverse=True)[:num_sentences]
+
+    # keep the picked sentences in article order so the bullets still read naturally
+    return [sentences[index] for index in sorted(top)]
+
+
+def score_bias(text: str) -> str:
+    # density of loaded language, a rough stand-in for the llm's bias rating
+    words = WORD.findall(text.lower())
+    if not words:
+        return "Low"
+
+    loaded = sum(1 for word in words if word in LOADED_WORDS)
+    hedged = sum(1 for word in words if word in HEDGE_WORDS)
+    exclaimed = text.count("!")
+
+    density = (loaded + 0.5 * hedged + 0.5 * exclaimed) / len(words) * 1000
+
+    if density >= 12:
+        return "High"
+    if density >= 4:
+        return "Medium"
+    return "Low"
+
+
+def summarize_locally(text: str) -> dict:
+    return {
+        "summary": summarize_extractive(text),
+        "bias": score_bias(text)
+    }
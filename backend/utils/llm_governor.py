@@ -0,0 +1,260 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, Optional
+from openai import APITimeoutError, InternalServerError, RateLimitError
+from core.config import settings
+from utils.metrics import LLM_RATE_LIMITED, record_stage
+from utils.tokens import count_tokens
+
+# lower runs first, requests someone is waiting on go ahead of prefetching
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# set by callers for everything they start, single-flight tasks inherit it from the caller that created them
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+# key of the single-flight call the current task runs for, see RateGovernor.flight
+llm_flight: ContextVar[Optional[Hashable]] = ContextVar("llm_flight", default=None)
+
+# the buckets hold this many seconds of the per-minute limits, providers also enforce them over short windows
+BURST_SECONDS = 10
+
+# chat formatting adds a few tokens per message on top of the content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@contextmanager
+def background_priority():
+    token = llm_priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+def estimate_tokens(messages: list, max_tokens: Optional[int]) -> int:
+    # prompt tokens plus the most the completion can use, corrected with the real usage afterwards
+    prompt = sum(count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for message in messages)
+    return prompt + (max_tokens or settings.OPENAI_DEFAULT_COMPLETION_TOKENS)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        # a limit of 0 turns the bucket off
+        self.rate = per_minute / 60
+        self.capacity = max(per_minute * BURST_SECONDS / 60, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.rate <= 0:
+            return 0
+        self._refill(now)
+        # a single call larger than the burst would never fit, it waits for a full bucket instead
+        needed = min(amount, self.capacity)
+        return max(0.0, (needed - self.tokens) / self.rate)
+
+    def take(self, amount: float, now: float):
+        if self.rate <= 0:
+            return
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        # positive gives tokens back, negative charges usage beyond the estimate (the bucket can go into debt)
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateGovernor:
+    # one queue in front of every llm call: rpm and tpm buckets, an adaptive concurrency limit and priorities
+    def __init__(self, rpm: int, tpm: int, min_concurrency: int, max_concurrency: int, target_latency: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.target_latency = target_latency
+
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+
+        # [priority, sequence, estimated tokens, future], the sequence keeps each priority first come first served
+        self._queue = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # flight key -> [priority, its queue entries], so callers joining a shared call can promote it
+        self._flights: Dict[Hashable, list] = {}
+
+    def queued(self) -> int:
+        return sum(1 for waiter in self._queue if not waiter[3].done())
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        while self._queue:
+            _, _, estimate, future = self._queue[0]
+            if future.done():
+                # cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+
+            if self.in_flight >= int(self.limit):
+                # a finishing call dispatches again
+                return
+
+            wait = max(
+                self.paused_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(estimate, now)
+            )
+            if wait > 0:
+                # strict priority, nothing overtakes the head of the queue while it waits for the buckets
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self.requests.take(1, now)
+            self.tokens.take(estimate, now)
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def _acquire(self, estimate: int, priority: int):
+        flight = self._flights.get(llm_flight.get())
+        if flight is not None:
+            priority = min(priority, flight[0])
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), estimate, future]
+        heapq.heappush(self._queue, entry)
+        if flight is not None:
+            flight[1].append(entry)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was granted just as the caller went away, the request was never sent
+                self.in_flight -= 1
+                self.requests.adjust(1)
+                self.tokens.adjust(estimate)
+                self._dispatch()
+            raise
+        finally:
+            if flight is not None:
+                flight[1].remove(entry)
+
+    @contextmanager
+    def flight(self, key: Hashable):
+        # wraps the body of a single-flight call, its llm calls then run at the best priority of
+        # every caller waiting on it rather than that of whoever happened to start it
+        token = llm_flight.set(key)
+        self._flights[key] = [llm_priority.get(), []]
+        try:
+            yield
+        finally:
+            self._flights.pop(key, None)
+            llm_flight.reset(token)
+
+    def promote(self, key: Hashable, priority: int):
+        # a user joined a call prefetch started, its queued request must not keep waiting as background work
+        flight = self._flights.get(key)
+        if flight is None or priority >= flight[0]:
+            return
+
+        flight[0] = priority
+        for entry in flight[1]:
+            entry[0] = min(entry[0], priority)
+
+        if flight[1]:
+            heapq.heapify(self._queue)
+            self._dispatch()
+
+    def _release(self, estimate: int, used: Optional[int], latency: Optional[float], error: Optional[BaseException]):
+        self.in_flight -= 1
+
+        if used is not None:
+            self.tokens.adjust(estimate - used)
+
+        if isinstance(error, RateLimitError):
+            # halve the concurrency and hold every caller back until the provider's window resets,
+            # instead of letting each of them run into the same 429
+            LLM_RATE_LIMITED.inc()
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            delay = retry_after(error) or settings.OPENAI_RETRY_BASE_DELAY_SECONDS
+            self.paused_until = max(self.paused_until, time.monotonic() + min(delay, settings.OPENAI_RETRY_MAX_DELAY_SECONDS))
+        elif isinstance(error, (APITimeoutError, InternalServerError)):
+            # a timeout or 5xx is the provider struggling, the same as a call over the target latency
+            self.limit = max(self.min_concurrency, self.limit * 0.9)
+        elif latency is not None:
+            # aimd: back off gently while the provider is slow, otherwise grow by about one call per round trip
+            if self.target_latency > 0 and latency > self.target_latency:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, estimate: int):
+        # the caller stores the real token count in usage["tokens"] when the provider reports it,
+        # and an error it handled itself (a 429 it is about to retry, say) in usage["error"]
+        queued_at = time.perf_counter()
+        await self._acquire(estimate, llm_priority.get())
+        record_stage("llm_queue", time.perf_counter() - queued_at)
+
+        usage = {"tokens": None, "error": None}
+        started = time.monotonic()
+        try:
+            yield usage
+        except BaseException as e:
+            self._release(estimate, usage["tokens"], None, e)
+            raise
+
+        if usage["error"] is not None:
+            self._release(estimate, usage["tokens"], None, usage["error"])
+        else:
+            self._release(estimate, usage["tokens"], time.monotonic() - started, None)
+
+
+_governor: Optional[RateGovernor] = None
+
+
+def get_governor() -> RateGovernor:
+    global _governor
+
+    if _governor is None:
+        _governor = RateGovernor(
+            rpm=settings.OPENAI_RPM_LIMIT,
+            tpm=settings.OPENAI_TPM_LIMIT,
+            min_concurrency=settings.OPENAI_MIN_CONCURRENCY,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+            target_latency=settings.OPENAI_TARGET_LATENCY_SECONDS
+        )
+
+    return _governor
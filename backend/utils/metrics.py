@@ -0,0 +1,242 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from pymongo import monitoring
+from core.config import settings
+from utils.cache import CACHES
+
+# a small prometheus text-format registry, every process exposes its own numbers
+
+METRICS: List["Metric"] = []
+
+# (stage, seconds) pairs timed during the current request, read by the Server-Timing header
+_request_stages: ContextVar[Optional[list]] = ContextVar("request_stages", default=None)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        # pymongo listeners run on motor's worker threads
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per bucket counts (+inf last), sum, count]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "news_http_request_duration_seconds",
+    "Time to serve a request, up to the last body chunk",
+    ("method", "route", "status")
+)
+
+STAGE_SECONDS = Histogram(
+    "news_stage_duration_seconds",
+    "Time spent in one stage of a request (jwt, mongo, newsdata, download, parse, llm_queue, openai, llm_parse)",
+    ("stage",)
+)
+
+LLM_TOKENS = Counter(
+    "news_llm_tokens_total",
+    "Tokens used by OpenAI calls",
+    ("kind",)
+)
+
+LLM_RATE_LIMITED = Counter(
+    "news_llm_rate_limited_total",
+    "OpenAI calls answered with a 429"
+)
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage)
+
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_token_usage(usage):
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, "prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, "completion")
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    # pymongo reports the server round trip of every command, motor runs it in a copy of our context
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record_stage("mongo", event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        record_stage("mongo", event.duration_micros / 1_000_000)
+
+
+def _cache_lines() -> List[str]:
+    # cache counters live on the caches themselves, they are only formatted here
+    families = {
+        "news_cache_hits_total": ("counter", "Cache lookups that found a value", "hits"),
+        "news_cache_negative_hits_total": ("counter", "Cache lookups that found a cached failure", "negative_hits"),
+        "news_cache_misses_total": ("counter", "Cache lookups that found nothing", "misses"),
+        "news_cache_evictions_total": ("counter", "Entries evicted to stay in the byte budget", "evictions"),
+        "news_cache_errors_total": ("counter", "Failed calls to a shared cache backend", "errors"),
+        "news_cache_bytes": ("gauge", "Estimated size of the cached values", "bytes"),
+        "news_cache_entries": ("gauge", "Number of cached entries", "entries"),
+        "news_cache_hit_ratio": ("gauge", "Share of lookups served from the cache", "hit_ratio")
+    }
+
+    stats = {name: cache.stats() for name, cache in CACHES.items()}
+    lines = []
+    for metric, (kind, description, key) in families.items():
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        # shared backends do not know entry counts or sizes, those series are left out for them
+        for name, values in stats.items():
+            if key in values:
+                lines.append(f'{metric}{{cache="{_escape(name)}"}} {values[key]}')
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_cache_lines())
+    return "\n".join(lines) + "\n"
+
+
+def _server_timing(stages: list, total: float) -> str:
+    # repeated stages (several mongo queries, say) are summed into one entry
+    durations: Dict[str, list] = {}
+    for stage, seconds in stages:
+        entry = durations.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    parts = [
+        f'{stage};dur={seconds * 1000:.1f};desc="{count}x"' if count > 1 else f"{stage};dur={seconds * 1000:.1f}"
+        for stage, (seconds, count) in durations.items()
+    ]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    # plain asgi middleware, so streaming responses pass through untouched
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages = []
+        token = _request_stages.set(stages)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    # only what finished before the headers went out, later stages of a stream are not included
+                    header = _server_timing(stages, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            )
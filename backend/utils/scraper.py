@@ -0,0 +1,195 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from newspaper import Article as NewsArticle, Config as NewsConfig, network
+from core.config import settings
+from utils.metrics import record_stage
+
+
+class ScrapeError(Exception):
+    pass
+
+
+class ScrapeTimeout(ScrapeError):
+    pass
+
+
+class ScrapeGone(ScrapeError):
+    # the publisher answered 404 or 410, the article was taken down
+    pass
+
+
+_executor: Optional[Executor] = None
+_global_limit: Optional[asyncio.Semaphore] = None
+
+# domain -> [semaphore, number of callers holding or waiting on it]
+_domain_limits: Dict[str, list] = {}
+
+
+def _scrape(article_url: str, request_timeout: float, etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
+    # runs inside the worker pool, so it must stay a picklable module-level function
+    config = NewsConfig()
+    config.request_timeout = request_timeout
+    config.memoize_articles = False
+    # top_image still comes from the page metadata, this only skips downloading every image
+    config.fetch_images = False
+
+    # the page is fetched here rather than by newspaper, so the request can be conditional
+    headers = {"User-Agent": config.browser_user_agent}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    # timed here because the pool may be another process, the caller records them
+    started = time.perf_counter()
+    response = requests.get(
+        article_url,
+        **network.get_request_kwargs(request_timeout, config.browser_user_agent, config.proxies, headers)
+    )
+    downloaded = time.perf_counter()
+
+    if response.status_code == 304:
+        return {"not_modified": True, "timings": {"download": downloaded - started}}
+
+    # returned rather than raised, the pool may be another process
+    if response.status_code in (404, 410):
+        return {"gone": response.status_code, "timings": {"download": downloaded - started}}
+
+    response.raise_for_status()
+
+    article = NewsArticle(article_url, config=config)
+    article.download(input_html=network.get_html_2XX_only(article_url, config, response))
+    article.parse()
+    parsed = time.perf_counter()
+
+    return {
+        "title": article.title,
+        "text": article.text,
+        "image": article.top_image,
+        "authors": article.authors,
+        "published_date": str(article.publish_date),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "timings": {"download": downloaded - started, "parse": parsed - downloaded}
+    }
+
+
+def get_executor() -> Executor:
+    global _executor
+
+    if _executor is None:
+        if settings.SCRAPER_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.SCRAPER_MAX_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SCRAPER_MAX_WORKERS,
+                thread_name_prefix="scraper"
+            )
+
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _get_global_limit() -> asyncio.Semaphore:
+    global _global_limit
+
+    if _global_limit is None:
+        _global_limit = asyncio.Semaphore(settings.SCRAPER_MAX_CONCURRENCY)
+
+    return _global_limit
+
+
+def _leave_domain(domain: str, slot: list):
+    slot[1] -= 1
+    # forget idle domains so the table does not grow with every site ever scraped
+    if slot[1] == 0:
+        _domain_limits.pop(domain, None)
+
+
+async def _acquire_slots(domain: str) -> Callable[[], None]:
+    # takes a domain slot and a global slot, returns the function that gives both back
+    slot = _domain_limits.get(domain)
+    if slot is None:
+        slot = _domain_limits[domain] = [asyncio.Semaphore(settings.SCRAPER_MAX_PER_DOMAIN), 0]
+
+    slot[1] += 1
+    try:
+        await slot[0].acquire()
+        try:
+            await _get_global_limit().acquire()
+        except BaseException:
+            slot[0].release()
+            raise
+    except BaseException:
+        _leave_domain(domain, slot)
+        raise
+
+    def release():
+        _get_global_limit().release()
+        slot[0].release()
+        _leave_domain(domain, slot)
+
+    return release
+
+
+async def _run(article_url: str, etag: Optional[str], last_modified: Optional[str]) -> dict:
+    domain = urlsplit(article_url).netloc.lower()
+    loop = asyncio.get_running_loop()
+
+    release = await _acquire_slots(domain)
+    try:
+        future = loop.run_in_executor(
+            get_executor(),
+            _scrape,
+            article_url,
+            settings.SCRAPER_TIMEOUT_SECONDS,
+            etag,
+            last_modified
+        )
+    except BaseException:
+        release()
+        raise
+
+    def finished(done: asyncio.Future):
+        # the worker cannot be stopped, so its slots are only given back once the download really ends,
+        # a caller that timed out must not let more requests at a slow domain
+        if not done.cancelled():
+            done.exception()  # retrieved here, the caller may be gone
+        release()
+
+    future.add_done_callback(finished)
+
+    # shielded, cancelling the caller must not mark the future done while the worker still runs
+    article = await asyncio.shield(future)
+
+    for stage, seconds in article.pop("timings").items():
+        record_stage(stage, seconds)
+
+    if article.get("gone"):
+        raise ScrapeGone(f"{article_url} returned {article['gone']}")
+
+    return article
+
+
+async def scrape_article(article_url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
+    # with validators from an earlier fetch an unchanged page comes back as {"not_modified": True}
+    # the timeout covers waiting for a slot as well, so a backed-up domain cannot stall callers
+    try:
+        return await asyncio.wait_for(_run(article_url, etag, last_modified), timeout=settings.SCRAPER_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise ScrapeTimeout(f"Timed out scraping {article_url}")
+    except ScrapeGone:
+        raise
+    except Exception as e:
+        raise ScrapeError(str(e)) from e
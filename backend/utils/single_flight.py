@@ -0,0 +1,43 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        # key -> task for the call currently running on behalf of every caller of that key
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable):
+        return key in self._calls
+
+    def pending(self) -> List[asyncio.Task]:
+        return list(self._calls.values())
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        # shield so one caller disconnecting does not cancel the work for everyone else
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
@@ -1,42 +1,155 @@
+import asyncio
+import hashlib
 import json
-from openai import OpenAI
+import random
+import time
+from typing import Optional
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    OpenAIError,
+    RateLimitError
+)
 from core.config import settings
+from utils.llm_governor import estimate_tokens, get_governor, retry_after
+from utils.metrics import record_stage, record_token_usage, timed
+from utils.tokens import chunk_sentences, clip_to_tokens, count_tokens
+
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APITimeoutError, APIConnectionError)
+
+# bump whenever the prompt in summarize_article changes, so cached summaries from the old prompt are not reused
+PROMPT_VERSION = "2"
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_client() -> AsyncOpenAI:
+    global _client
+
+    if _client is None:
+        # retries are handled below so they can be jittered and go through the rate governor
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            max_retries=0
+        )
+
+    return _client
+
+
+async def close_client():
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    # a 429 pauses the governor for every caller until Retry-After, so the retry just queues again
+    if isinstance(error, RateLimitError):
+        return 0
+
+    # honour Retry-After elsewhere, otherwise exponential backoff with full jitter
+    delay = retry_after(error)
+    if delay is not None:
+        return min(delay, settings.OPENAI_RETRY_MAX_DELAY_SECONDS)
+
+    ceiling = min(
+        settings.OPENAI_RETRY_MAX_DELAY_SECONDS,
+        settings.OPENAI_RETRY_BASE_DELAY_SECONDS * (2 ** attempt)
+    )
+    return random.uniform(0, ceiling)
+
+
+async def create_chat_completion(**kwargs):
+    client = get_client()
+    estimate = estimate_tokens(kwargs["messages"], kwargs.get("max_tokens"))
+
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        try:
+            async with get_governor().slot(estimate) as usage:
+                with timed("openai"):
+                    response = await client.chat.completions.create(**kwargs)
+                if response.usage is not None:
+                    usage["tokens"] = response.usage.total_tokens
+            record_token_usage(response.usage)
+            return response
+        except RETRYABLE_ERRORS as e:
+            if attempt == settings.OPENAI_MAX_RETRIES:
+                raise
+
+            delay = _retry_delay(attempt, e)
+            print(f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+async def stream_chat_completion(**kwargs):
+    # yields content deltas, the governor slot is held until the stream is fully read
+    client = get_client()
+    estimate = estimate_tokens(kwargs["messages"], kwargs.get("max_tokens"))
+
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        delay = None
+
+        async with get_governor().slot(estimate) as usage:
+            try:
+                started = time.perf_counter()
+                stream = await client.chat.completions.create(
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs
+                )
+            except RETRYABLE_ERRORS as e:
+                if attempt == settings.OPENAI_MAX_RETRIES:
+                    raise
+                usage["error"] = e
+                delay = _retry_delay(attempt, e)
+                print(f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            else:
+                # once tokens have been handed out the call can no longer be retried transparently
+                async with stream:
+                    async for chunk in stream:
+                        # with include_usage the last chunk carries the token counts and no choices
+                        record_token_usage(chunk.usage)
+                        if chunk.usage is not None:
+                            usage["tokens"] = chunk.usage.total_tokens
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                record_stage("openai", time.perf_counter() - started)
+                return
+
+        await asyncio.sleep(delay)
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 def clean_text(text: str):
     return " ".join(text.split())
 
-async def summarize_article(text: str):
 
-    text = clean_text(text)
+def truncate_text(text: str) -> str:
+    # the per-article token budget, cut on a sentence boundary
+    return clip_to_tokens(clean_text(text), settings.SUMMARY_ARTICLE_TOKEN_BUDGET)
 
-    # skip summarizing very small articles
-    if len(text.split()) < 60:
-        return {
-            "summary": [text],
-            "bias": "Low"
-        }
 
-    MAX_CHARS = 3500
-    truncated_text = text[:MAX_CHARS]
-
-    # avoid cutting mid sentence
-    last_period = truncated_text.rfind(".")
-    if last_period != -1:
-        truncated_text = truncated_text[:last_period + 1]
-
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "You summarize news articles and detect bias."
-            },
-            {
-                "role": "user",
-                "content": f"""
+def summary_cache_key(text: str) -> str:
+    # identical prompt input, model and prompt version always produce an interchangeable summary
+    truncated_text = truncate_text(text)
+    material = f"{settings.OPENAI_MODEL}\n{PROMPT_VERSION}\n{truncated_text}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def build_messages(truncated_text: str) -> list:
+    return [
+        {
+            "role": "system",
+            "content": "You summarize news articles and detect bias."
+        },
+        {
+            "role": "user",
+            "content": f"""
                 Summarize the article in exactly 5 bullet points.
 
                 Also classify bias as:
@@ -60,14 +173,43 @@ async def summarize_article(text: str):
                 Article:
                 {truncated_text}
                 """
-            }
-        ],
-        max_tokens=200,
-        temperature=0.3,
-        response_format={"type": "json_object"}
-    )
+        }
+    ]
+
 
-    content = response.choices[0].message.content
+def build_chunk_messages(chunk: str) -> list:
+    return [
+        {
+            "role": "system",
+            "content": "You summarize news articles and detect bias."
+        },
+        {
+            "role": "user",
+            "content": f"""
+                This is one part of a longer news article.
+                List its key facts in at most 3 short bullet points, keeping any loaded or one-sided wording.
+
+                Return STRICT JSON ONLY in this format:
+
+                {{
+                    "points": ["point1", "point2", "point3"]
+                }}
+
+                Article part:
+                {chunk}
+                """
+        }
+    ]
+
+
+COMPLETION_OPTIONS = {
+    "max_tokens": 200,
+    "temperature": 0.3,
+    "response_format": {"type": "json_object"}
+}
+
+
+def parse_summary(content: Optional[str]) -> dict:
 
     if not content:
         return {
@@ -76,7 +218,8 @@ async def summarize_article(text: str):
         }
 
     try:
-        parsed = json.loads(content)
+        with timed("llm_parse"):
+            parsed = json.loads(content)
         return parsed
     except Exception:
         print("AI RAW RESPONSE: ", content)
@@ -84,3 +227,143 @@ async def summarize_article(text: str):
             "summary": [content.strip()],
             "bias": "Unknown"
         }
+
+
+class SummaryStreamParser:
+    # pulls completed strings out of the "summary" array of a json object that is still streaming in
+    def __init__(self):
+        self.buffer = ""
+        self._pos = None
+        self._done = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, delta: str) -> list:
+        self.buffer += delta
+        bullets = []
+
+        if self._done:
+            return bullets
+
+        if self._pos is None:
+            key = self.buffer.find('"summary"')
+            start = self.buffer.find("[", key) if key != -1 else -1
+            if start == -1:
+                return bullets
+            self._pos = start + 1
+
+        while True:
+            # skip separators between array items
+            while self._pos < len(self.buffer) and self.buffer[self._pos] in " \t\r\n,":
+                self._pos += 1
+
+            if self._pos >= len(self.buffer):
+                return bullets
+
+            if self.buffer[self._pos] == "]":
+                self._done = True
+                return bullets
+
+            try:
+                bullet, end = self._decoder.raw_decode(self.buffer, self._pos)
+            except json.JSONDecodeError:
+                # the current item is still incomplete
+                return bullets
+
+            bullets.append(bullet)
+            self._pos = end
+
+
+async def _summarize_chunk(chunk: str, limit: asyncio.Semaphore) -> list:
+    async with limit:
+        response = await create_chat_completion(
+            model=settings.OPENAI_MODEL,
+            messages=build_chunk_messages(chunk),
+            max_tokens=150,
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+
+    content = response.choices[0].message.content or ""
+    try:
+        points = json.loads(content).get("points", [])
+    except Exception:
+        points = [content.strip()]
+
+    return [point for point in points if isinstance(point, str) and point]
+
+
+async def prepare_prompt_text(text: str) -> str:
+    # short articles go to the final prompt as they are, long ones are mapped to notes first
+    truncated_text = truncate_text(text)
+
+    if count_tokens(truncated_text) <= settings.SUMMARY_CHUNK_TOKENS:
+        return truncated_text
+
+    chunks = chunk_sentences(truncated_text, settings.SUMMARY_CHUNK_TOKENS)
+    limit = asyncio.Semaphore(settings.SUMMARY_MAP_CONCURRENCY)
+    notes = await asyncio.gather(*(_summarize_chunk(chunk, limit) for chunk in chunks))
+    notes = "\n".join(f"- {point}" for points in notes for point in points)
+
+    # if the map step produced nothing usable, fall back to the leading part of the article
+    return notes or clip_to_tokens(truncated_text, settings.SUMMARY_CHUNK_TOKENS)
+
+
+def estimate_llm_calls(text: str) -> int:
+    # api calls summarize_article makes for this text, one per chunk plus the final one for long articles
+    text = clean_text(text)
+    if len(text.split()) < 60:
+        return 0
+
+    truncated_text = truncate_text(text)
+    if count_tokens(truncated_text) <= settings.SUMMARY_CHUNK_TOKENS:
+        return 1
+    return len(chunk_sentences(truncated_text, settings.SUMMARY_CHUNK_TOKENS)) + 1
+
+
+async def summarize_article(text: str):
+
+    text = clean_text(text)
+
+    # skip summarizing very small articles
+    if len(text.split()) < 60:
+        return {
+            "summary": [text],
+            "bias": "Low"
+        }
+
+    try:
+        prompt_text = await prepare_prompt_text(text)
+
+        response = await create_chat_completion(
+            model=settings.OPENAI_MODEL,
+            messages=build_messages(prompt_text),
+            **COMPLETION_OPTIONS
+        )
+    except OpenAIError as e:
+        print("OpenAI error", e)
+        return None
+
+    return parse_summary(response.choices[0].message.content)
+
+
+async def stream_summary_article(text: str):
+    # yields ("bullet", str) as soon as each summary point is complete, then ("result", dict)
+    text = clean_text(text)
+
+    if len(text.split()) < 60:
+        yield "bullet", text
+        yield "result", {"summary": [text], "bias": "Low"}
+        return
+
+    parser = SummaryStreamParser()
+    prompt_text = await prepare_prompt_text(text)
+
+    async for delta in stream_chat_completion(
+        model=settings.OPENAI_MODEL,
+        messages=build_messages(prompt_text),
+        **COMPLETION_OPTIONS
+    ):
+        for bullet in parser.feed(delta):
+            yield "bullet", bullet
+
+    yield "result", parse_summary(parser.buffer)
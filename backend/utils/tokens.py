@@ -0,0 +1,131 @@
+import asyncio
+import math
+import re
+from typing import Dict, List, Optional
+import tiktoken
+from core.config import settings
+
+# used when the encoding cannot be loaded
+CHARS_PER_TOKEN = 4
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+
+
+# model -> encoding, None once it failed to load, so a process counts the same way for its whole life
+_encodings: Dict[str, Optional[tiktoken.Encoding]] = {}
+
+
+def _warn_estimated(model: str, reason):
+    print(
+        f"WARNING: tokenizer for {model} unavailable ({reason}), token counts are estimated as "
+        f"{CHARS_PER_TOKEN} characters per token. Truncation and summary cache keys will not match "
+        "processes that have it, point TIKTOKEN_CACHE_DIR at a directory holding the encoding files"
+    )
+
+
+def _load_encoding(model: str) -> Optional[tiktoken.Encoding]:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # encodings are downloaded on first use unless TIKTOKEN_CACHE_DIR has them, offline hosts fail here
+        _warn_estimated(model, e)
+        return None
+
+
+def _encoding(model: str) -> Optional[tiktoken.Encoding]:
+    if model not in _encodings:
+        encoding = _load_encoding(model)
+        # a load that finished after load_tokenizer gave up does not change the counts any more
+        _encodings.setdefault(model, encoding)
+    return _encodings[model]
+
+
+async def load_tokenizer(timeout: float):
+    # called once at startup, the download has no timeout of its own and must not run on the event loop
+    model = settings.OPENAI_MODEL
+    try:
+        await asyncio.wait_for(asyncio.to_thread(_encoding, model), timeout=timeout)
+    except asyncio.TimeoutError:
+        _warn_estimated(model, f"not loaded within {timeout}s")
+        _encodings.setdefault(model, None)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    encoding = _encoding(model or settings.OPENAI_MODEL)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence]
+
+
+def _split_words(text: str, max_tokens: int) -> List[str]:
+    # a sentence over the budget on its own is cut into pieces that fit, between words
+    pieces = []
+    current = []
+    used = 0
+
+    for word in text.split():
+        tokens = count_tokens(" " + word)
+        if current and used + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+            used = 0
+        current.append(word)
+        used += tokens
+
+    if current:
+        pieces.append(" ".join(current))
+
+    return pieces
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    # keep whole sentences only, as long as they fit in the budget
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+
+    # a first sentence longer than the budget is cut between words
+    return " ".join(kept) if kept else _split_words(text, max_tokens)[0]
+
+
+def chunk_sentences(text: str, max_tokens: int) -> List[str]:
+    chunks = []
+    current = []
+    used = 0
+
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+
+        if tokens > max_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current = []
+                used = 0
+            chunks.extend(_split_words(sentence, max_tokens))
+            continue
+
+        if current and used + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current = []
+            used = 0
+        current.append(sentence)
+        used += tokens
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks
@@ -6,13 +6,27 @@ import { Spinner } from "../components/index.js";
 function MyArticlesPage() {
 
     const [savedArticles, setSavedArticles] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+
+    // only the fields the cards render, the summary is loaded on the summary page
+    const fetchSavedArticles = async (cursor = null) => {
+        const response = await api.get("/api/articles/saved-articles", {
+            params: {
+                limit: 20,
+                fields: "title,description,image_url,source",
+                ...(cursor ? { cursor } : {})
+            }
+        });
+        setSavedArticles(prev => cursor ? [...prev, ...response.data.items] : response.data.items);
+        setNextCursor(response.data.next_cursor);
+    }
 
     useEffect(() => {
-        const fetchSavedArticles = async () => {
+        const fetchFirstPage = async () => {
             try {
-                const response = await api.get("/api/articles/saved-articles");
-                setSavedArticles(response.data);
+                await fetchSavedArticles();
             }
             catch (err) {
                 console.log("Error fetching saved articles", err);
@@ -21,9 +35,22 @@ function MyArticlesPage() {
                 setLoading(false);
             }
         }
-        fetchSavedArticles();
+        fetchFirstPage();
     }, []);
 
+    const handleLoadMore = async () => {
+        setLoadingMore(true);
+        try {
+            await fetchSavedArticles(nextCursor);
+        }
+        catch (err) {
+            console.log("Error fetching saved articles", err);
+        }
+        finally {
+            setLoadingMore(false);
+        }
+    }
+
     const handleRemove = async (article) => {
         try {
             await api.delete("/api/articles/remove-article", {
@@ -118,6 +145,20 @@ function MyArticlesPage() {
                         ))
                     }
                 </div>
+
+                {
+                    nextCursor && (
+                        <div className="mt-10 flex justify-center">
+                            <button
+                                className="inline-block w-fit dark:bg-indigo-500 dark:text-white p-2 text-lg cursor-pointer"
+                                onClick={handleLoadMore}
+                                disabled={loadingMore}
+                            >
+                                {loadingMore ? "Loading..." : "Load more"}
+                            </button>
+                        </div>
+                    )
+                }
             </div>
         </div>
     );